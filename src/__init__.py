@@ -1,3 +1,12 @@
 """
 Smart Home RPi Application
 """
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables once for the whole package, before any
+# submodule reads its configuration at import time.
+DOTENV_PATH = Path(__file__).resolve().parent.parent / ".env"
+DOTENV_LOADED = load_dotenv(dotenv_path=DOTENV_PATH)
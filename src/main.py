@@ -25,28 +25,46 @@ Usage:
     python main.py
 """
 
-import os
 import signal
 import sys
 
-from dotenv import load_dotenv
-
+from src import DOTENV_LOADED, DOTENV_PATH
 from src.sensors import camera, light, lux, reed, sound
-from utils.database import get_user_id_for_home
-from utils.logger import logger
-from utils.mqtt import _mqtt_client_instance, get_mqtt_client
-
-# Load environment variables from .env file
-dotenv_path = os.path.join(os.path.dirname(__file__), "..", ".env")
-loaded_dotenv = load_dotenv(dotenv_path=dotenv_path)
-
-if loaded_dotenv:
-    logger.info(f".env file loaded successfully from {dotenv_path}")
+from src.utils.cloudflare import init_r2_config
+from src.utils.database import (
+    get_user_id_for_home,
+    start_connection_health_check,
+    stop_connection_health_check,
+)
+from src.utils.logger import logger
+from src.utils.mqtt import (
+    disconnect_mqtt_client,
+    get_mqtt_client,
+    set_user_id_provider,
+)
+
+# Environment variables are loaded once by the src package on import
+if DOTENV_LOADED:
+    logger.info(f".env file loaded successfully from {DOTENV_PATH}")
 else:
     logger.warning(
-        f"Failed to load .env file from {dotenv_path}, or it was empty. Environment variables might not be set."
+        f"Failed to load .env file from {DOTENV_PATH}, or it was empty. Environment variables might not be set."
     )
 
+# Every module must be imported through the src package. Importing one as a
+# top-level "utils" module as well would load it twice, creating a second
+# Supabase client and attaching duplicate log handlers.
+_duplicate_modules = sorted(
+    name for name in sys.modules if name == "utils" or name.startswith("utils.")
+)
+if _duplicate_modules:
+    logger.error(
+        f"Modules imported outside the src package: {', '.join(_duplicate_modules)}"
+    )
+
+# Snapshot configuration that only needs to be read once
+init_r2_config()
+
 if __name__ == "__main__":
     logger.info("Starting Smart Home Application...")
 
@@ -68,7 +86,11 @@ if __name__ == "__main__":
     try:
         # Initialize all components in sequence
         # Order matters due to dependencies between components
+        logger.info("Starting database connection health check...")
+        start_connection_health_check()
+
         logger.info("Initializing MQTT Client...")
+        set_user_id_provider(get_user_id_for_home)
         get_mqtt_client()
 
         logger.info("Initializing Reed Switch Monitoring...")
@@ -107,12 +129,9 @@ if __name__ == "__main__":
         camera.stop_camera_streaming(app_home_id)
         lux.stop_lux_monitoring()
         light.cleanup_light()
+        stop_connection_health_check()
 
-        if _mqtt_client_instance and _mqtt_client_instance.is_connected():
-            logger.info("[Main] Disconnecting MQTT client...")
-            _mqtt_client_instance.loop_stop(force=False)
-            _mqtt_client_instance.disconnect()
-            logger.info("[Main] MQTT client disconnected.")
+        disconnect_mqtt_client()
 
         logger.info("[Main] Smart Home Application shut down.")
         sys.exit(0)
@@ -49,20 +49,30 @@ from typing import Optional
 
 import cv2
 import numpy as np
+import orjson
 from picamera2 import Picamera2
 from picamera2.encoders import H264Encoder, JpegEncoder
 from picamera2.outputs import FileOutput
 from PIL import Image
 
+try:
+    from turbojpeg import TJPF_RGB, TurboJPEG
+
+    # NEON-accelerated libjpeg-turbo encoder; needs the libturbojpeg library
+    _turbo_jpeg: Optional[TurboJPEG] = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _turbo_jpeg = None
+
 from src.utils.cloudflare import upload_file_to_r2
 from src.utils.database import (
+    DEVICE_STATE_COLUMNS,
     get_device_by_id,
     insert_device,
-    insert_event,
+    transition_device_state,
     update_device_state,
 )
 from src.utils.logger import logger
-from src.utils.mqtt import get_mqtt_client, publish_frame, publish_json
+from src.utils.mqtt import get_mqtt_client, is_frame_backlogged, publish_frame
 
 # Device configuration
 DEVICE_ID = "camera_01"
@@ -73,6 +83,7 @@ DEVICE_TYPE = "pi_camera"
 FRAME_WIDTH = 640
 FRAME_HEIGHT = 480
 FRAME_RATE = 30
+JPEG_QUALITY = 75  # live stream frames
 RECORDING_DURATION_SECONDS = 300  # 5 minutes
 VIDEO_FILE_PATH = "recording.h264"
 MP4_FILE_PATH = "recording.mp4"
@@ -86,6 +97,8 @@ _camera_thread: Optional[threading.Thread] = None
 _is_running = threading.Event()
 _last_motion_time = 0.0
 _last_frame = None
+# Reused for every PIL-encoded live frame; only touched by the camera thread
+_frame_buffer = io.BytesIO()
 
 
 def _setup_camera() -> bool:
@@ -256,6 +269,29 @@ def _setup_mqtt() -> bool:
         return False
 
 
+def _encode_frame_b64_with_pil(frame: np.ndarray) -> bytes:
+    """Encode a frame as base64 JPEG with PIL, the fallback without TurboJPEG.
+
+    Args:
+        frame: The RGB frame to encode
+
+    Returns:
+        bytes: The base64-encoded JPEG data
+    """
+    img = Image.fromarray(frame)
+    # Overwrite the reused buffer in place; bytes past jpeg_size are stale
+    _frame_buffer.seek(0)
+    img.save(
+        _frame_buffer,
+        format="JPEG",
+        quality=JPEG_QUALITY,
+        optimize=False,  # multi-pass Huffman optimisation is slow on the Pi
+    )
+    jpeg_size = _frame_buffer.tell()
+    with _frame_buffer.getbuffer() as jpeg_view:
+        return base64.b64encode(jpeg_view[:jpeg_size])
+
+
 def _process_and_publish_frame(frame: np.ndarray, home_id: str) -> None:
     """Process and publish a frame via MQTT.
 
@@ -263,12 +299,19 @@ def _process_and_publish_frame(frame: np.ndarray, home_id: str) -> None:
         frame: The frame to process and publish
         home_id: The ID of the home this camera belongs to
     """
+    if is_frame_backlogged():
+        # Earlier frames are still unsent; skip encoding one that would be dropped
+        return
+
     try:
         # Convert frame to JPEG
-        img = Image.fromarray(frame)
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format="JPEG")
-        img_byte_arr = img_byte_arr.getvalue()
+        if _turbo_jpeg is not None:
+            jpeg_bytes = _turbo_jpeg.encode(
+                frame, quality=JPEG_QUALITY, pixel_format=TJPF_RGB
+            )
+            image_b64 = base64.b64encode(jpeg_bytes)
+        else:
+            image_b64 = _encode_frame_b64_with_pil(frame)
 
         # Create message
         message = {
@@ -277,11 +320,17 @@ def _process_and_publish_frame(frame: np.ndarray, home_id: str) -> None:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "format": "jpeg",
             "resolution": f"{FRAME_WIDTH}x{FRAME_HEIGHT}",
-            "image_b64": base64.b64encode(img_byte_arr).decode("utf-8"),
         }
 
-        # Publish frame
-        publish_json(MQTT_CAMERA_LIVE_TOPIC, message)
+        # Append the base64 bytes as the last field directly: base64 never
+        # needs JSON escaping, so the image skips a str round trip and orjson
+        payload = bytearray(orjson.dumps(message))
+        payload[-1:] = b',"image_b64":"'
+        payload += image_b64
+        payload += b'"}'
+
+        # Publish frame through the backpressured frame path
+        publish_frame(MQTT_CAMERA_LIVE_TOPIC, payload)
 
     except Exception as e:
         logger.error(
@@ -624,7 +673,7 @@ def start_camera_streaming(home_id: str) -> None:
     global _picamera_object, _camera_thread, _is_running
 
     if _camera_thread and _camera_thread.is_alive() and _is_running.is_set():
-        device_db_info = get_device_by_id(DEVICE_ID)
+        device_db_info = get_device_by_id(DEVICE_ID, DEVICE_STATE_COLUMNS)
         if device_db_info:
             if device_db_info.get("current_state") == "online":
                 logger.info(
@@ -677,7 +726,7 @@ def start_camera_streaming(home_id: str) -> None:
         f"[{DEVICE_NAME}] Entering main try block for device registration and thread start..."
     )
     try:
-        current_device_in_db = get_device_by_id(DEVICE_ID)
+        current_device_in_db = get_device_by_id(DEVICE_ID, DEVICE_STATE_COLUMNS)
         logger.info(
             f"[{DEVICE_NAME}] Fetched current_device_in_db status: {'Exists' if current_device_in_db else 'Not Found'}"
             f" (State: {current_device_in_db.get('current_state') if current_device_in_db else 'N/A'})"
@@ -777,15 +826,13 @@ def _update_camera_state(home_id: str, new_state: str, message: str) -> None:
             # Do not update device state in DB or log an event for errors
             return
 
-        device = get_device_by_id(DEVICE_ID)
+        device = get_device_by_id(DEVICE_ID, DEVICE_STATE_COLUMNS)
         old_state = device.get("current_state") if device else None
 
         # Proceed with DB update only for non-error states
-        update_device_state(DEVICE_ID, new_state)
-
         if old_state != new_state:
             # Event logging will only occur for non-error state changes here
-            insert_event(
+            transition_device_state(
                 home_id=home_id,
                 device_id=DEVICE_ID,
                 event_type="camera_changed",
@@ -797,6 +844,7 @@ def _update_camera_state(home_id: str, new_state: str, message: str) -> None:
             )
         else:
             # This case handles when the state is confirmed but not changed (e.g. already online)
+            update_device_state(DEVICE_ID, new_state)
             logger.info(
                 f"[{DEVICE_NAME}] State remained {new_state}. No event logged. Message: {message}"
             )
@@ -918,7 +966,7 @@ def stop_camera_streaming(home_id: str) -> None:
             f"[{DEVICE_NAME}] _picamera_object was already None in stop_camera_streaming. No camera operations to perform."
         )
         # If it was supposed to be running, ensure state is offline if no error was previously set
-        device_state = get_device_by_id(DEVICE_ID)
+        device_state = get_device_by_id(DEVICE_ID, DEVICE_STATE_COLUMNS)
         if device_state and device_state.get("current_state") not in [
             "error",
             "offline",
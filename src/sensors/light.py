@@ -35,6 +35,7 @@ from typing import Optional
 from gpiozero import PWMLED
 
 from src.utils.database import (
+    DEVICE_STATE_BRIGHTNESS_COLUMNS,
     get_device_by_id,
     get_home_mode,
     get_user_id_for_home,
@@ -99,7 +100,7 @@ def initialize_light(home_id: str, user_id: Optional[str] = None) -> None:
         current_state_str = "on" if current_intensity_float > 0.0 else "off"
         brightness_int = int(current_intensity_float * 100)
 
-        device_in_db = get_device_by_id(DEVICE_ID)
+        device_in_db = get_device_by_id(DEVICE_ID, DEVICE_STATE_BRIGHTNESS_COLUMNS)
 
         if not device_in_db:
             logger.info(
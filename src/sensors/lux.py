@@ -43,13 +43,13 @@ import board
 import busio
 
 from src.utils.database import (
-    get_device_by_id,
-    get_latest_device_state,
+    get_device_with_latest_state,
     insert_device,
-    insert_event,
+    transition_device_state,
     update_device_state,
 )
 from src.utils.logger import logger
+from src.utils.threads import start_monitoring_thread
 
 DEVICE_ID = "lux_sensor_01"
 DEVICE_NAME = "Light Level Sensor"
@@ -135,13 +135,18 @@ def _read_sensor() -> tuple[float, int, int]:
         raise
 
 
-def _lux_monitoring_loop(home_id: str) -> None:
+def _lux_monitoring_loop(home_id: str, last_logged_state: Optional[str]) -> None:
     """Main monitoring loop for light level measurements.
 
     Continuously reads sensor values and processes changes
     in light levels. Runs in a separate thread.
 
+    Args:
+        home_id: The unique identifier for the home
+        last_logged_state: Latest state recorded in the event log at startup
+
     Note:
+        - Tracks the last logged state locally instead of re-querying it
         - Runs at MEASUREMENT_INTERVAL frequency
         - Implements debouncing via LUX_CHANGE_THRESHOLD
         - Handles sensor errors gracefully
@@ -153,6 +158,7 @@ def _lux_monitoring_loop(home_id: str) -> None:
 
     first_reading_after_start = True
     last_lux_value = None
+    old_state_str = last_logged_state
 
     while _is_monitoring.is_set():
         if _sensor is None:
@@ -180,22 +186,18 @@ def _lux_monitoring_loop(home_id: str) -> None:
 
             current_status_str = categorize_lux(lux)
 
-            old_state_str = get_latest_device_state(
-                home_id=home_id, device_id=DEVICE_ID
-            )
-
             if first_reading_after_start and old_state_str is None:
                 logger.info(
                     f"{log_prefix} First state detected after start: '{current_status_str}' ({lux:.1f} lux). Previous state not recorded or device is new. Logging event."
                 )
-                update_device_state(device_id=DEVICE_ID, new_state=current_status_str)
-                insert_event(
+                transition_device_state(
                     home_id=home_id,
                     device_id=DEVICE_ID,
                     event_type="lux_changed",
                     old_state=None,
                     new_state=current_status_str,
                 )
+                old_state_str = current_status_str
                 first_reading_after_start = False
             elif old_state_str != current_status_str:
                 log_message_old_state = (
@@ -206,14 +208,14 @@ def _lux_monitoring_loop(home_id: str) -> None:
                 logger.info(
                     f"{log_prefix} State changed from '{log_message_old_state}' to '{current_status_str}' ({lux:.1f} lux). Logging event."
                 )
-                update_device_state(device_id=DEVICE_ID, new_state=current_status_str)
-                insert_event(
+                transition_device_state(
                     home_id=home_id,
                     device_id=DEVICE_ID,
                     event_type="lux_changed",
                     old_state=old_state_str,
                     new_state=current_status_str,
                 )
+                old_state_str = current_status_str
             else:
                 if first_reading_after_start:
                     first_reading_after_start = False
@@ -268,7 +270,7 @@ def start_lux_monitoring(home_id: str) -> bool:
             logger.error(f"{log_prefix} Failed to get initial reading: {e_test}")
             raise
 
-        device = get_device_by_id(DEVICE_ID)
+        device = get_device_with_latest_state(home_id, DEVICE_ID)
         initial_state = categorize_lux(initial_lux)
         if not device:
             logger.info(
@@ -289,12 +291,10 @@ def start_lux_monitoring(home_id: str) -> bool:
             )
 
         _is_monitoring.set()
-        _monitoring_thread = threading.Thread(
-            target=_lux_monitoring_loop,
-            args=(home_id,),
-            daemon=True,
+        last_logged_state = device.get("latest_state") if device else None
+        _monitoring_thread = start_monitoring_thread(
+            _lux_monitoring_loop, home_id, last_logged_state
         )
-        _monitoring_thread.start()
         logger.info(f"{log_prefix} Monitoring thread started.")
         return True
 
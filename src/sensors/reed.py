@@ -34,16 +34,17 @@ from typing import Optional
 import RPi.GPIO as GPIO
 
 from src.utils.database import (
+    DEVICE_STATE_COLUMNS,
     get_device_by_id,
     get_home_mode,
     get_latest_device_state,
     get_user_id_for_home,
     insert_alert,
     insert_device,
-    insert_event,
-    update_device_state,
+    transition_device_state,
 )
 from src.utils.logger import logger
+from src.utils.threads import start_monitoring_thread
 
 DEVICE_ID = "door_sensor_01"
 DEVICE_NAME = "Door Reed Switch"
@@ -77,15 +78,13 @@ def _on_door_opened_logic(
         Exception: If database operations fail
     """
     logger.info(f"[{DEVICE_NAME}] Door opened detected.")
-    update_device_state(DEVICE_ID, "open")
-
     actual_old_state = (
         old_state_from_loop
         if old_state_from_loop is not None
         else get_latest_device_state(home_id, DEVICE_ID) or "unknown"
     )
 
-    insert_event(
+    transition_device_state(
         home_id=home_id,
         device_id=DEVICE_ID,
         event_type="door_changed",
@@ -121,15 +120,13 @@ def _on_door_closed_logic(home_id: str, old_state_from_loop: Optional[str]):
         Exception: If database operations fail
     """
     logger.info(f"[{DEVICE_NAME}] Door closed detected.")
-    update_device_state(DEVICE_ID, "closed")
-
     actual_old_state = (
         old_state_from_loop
         if old_state_from_loop is not None
         else get_latest_device_state(home_id, DEVICE_ID) or "unknown"
     )
 
-    insert_event(
+    transition_device_state(
         home_id=home_id,
         device_id=DEVICE_ID,
         event_type="door_changed",
@@ -266,7 +263,7 @@ def start_reed_monitoring(home_id: str, user_id: Optional[str]) -> None:
 
         _last_event_time = 0
 
-        device = get_device_by_id(DEVICE_ID)
+        device = get_device_by_id(DEVICE_ID, DEVICE_STATE_COLUMNS)
         if not device:
             pin_signal_initial = GPIO.input(REED_PIN)
             initial_state_for_db = (
@@ -306,11 +303,9 @@ def start_reed_monitoring(home_id: str, user_id: Optional[str]) -> None:
                 )
 
         _is_monitoring.set()
-        _monitoring_thread = threading.Thread(
-            target=_reed_monitoring_loop, args=(home_id, user_id)
+        _monitoring_thread = start_monitoring_thread(
+            _reed_monitoring_loop, home_id, user_id
         )
-        _monitoring_thread.daemon = True
-        _monitoring_thread.start()
         logger.info(f"[{DEVICE_NAME}] Monitoring thread started.")
 
     except Exception as e:
@@ -30,26 +30,32 @@ Dependencies:
     - database: For state persistence and event logging
 """
 
+import functools
+import logging
 import threading
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 from gpiozero import InputDevice
 
 from src.utils.database import (
+    DEVICE_STATE_COLUMNS,
     get_device_by_id,
     get_home_mode,
     insert_device,
-    insert_event,
+    transition_device_state,
     update_device_state,
 )
-from src.utils.logger import logger
+from src.utils.logger import get_context_logger
+from src.utils.threads import start_monitoring_thread
 
 # Device configuration
 DEVICE_ID = "sound_sensor_01"
 DEVICE_NAME = "Sound Sensor"
 DEVICE_TYPE = "sound_sensor"
 
+logger = get_context_logger(DEVICE_NAME)
+
 # GPIO configuration
 GPIO_PIN_SOUND = 20  # BCM pin number
 
@@ -57,29 +63,34 @@ GPIO_PIN_SOUND = 20  # BCM pin number
 _sound_sensor: Optional[InputDevice] = None
 _monitoring_thread: Optional[threading.Thread] = None
 _is_monitoring = threading.Event()
+_stop_requested = threading.Event()  # Wakes the loop early when stopping
 _last_detection_time = 0
 _last_health_check_time = 0
+# Device row fields known at startup, kept locally instead of re-querying the DB
+_device_info: dict = {}
 
 # Configuration constants
 DETECTION_COOLDOWN = 600.0  # 10 minutes cooldown between detections
 HEALTH_CHECK_INTERVAL = 30.0  # Check sensor health every 30 seconds
+POLL_INTERVAL = 0.1  # Pin polling interval outside the cooldown window
 
 
 def _handle_disconnection():
     """Handle sensor disconnection by updating state and logging."""
-    logger.error(f"[{DEVICE_NAME}] Sensor appears to be disconnected")
-    update_device_state(DEVICE_ID, "disconnected")
-
-    device = get_device_by_id(DEVICE_ID)
-    if device:
-        old_state = device.get("current_state", "unknown")
-        insert_event(
-            home_id=device.get("home_id"),
-            device_id=DEVICE_ID,
-            event_type="sensor_changed",
-            old_state=old_state,
-            new_state="disconnected",
-        )
+    logger.error("Sensor appears to be disconnected")
+    if not _device_info:
+        update_device_state(DEVICE_ID, "disconnected")
+        return
+
+    old_state = _device_info.get("current_state", "unknown")
+    _device_info["current_state"] = "disconnected"
+    transition_device_state(
+        home_id=_device_info["home_id"],
+        device_id=DEVICE_ID,
+        event_type="sensor_changed",
+        old_state=old_state,
+        new_state="disconnected",
+    )
 
 
 def _check_sensor_health() -> bool:
@@ -99,69 +110,81 @@ def _check_sensor_health() -> bool:
         return True
 
     except Exception as e:
-        logger.error(f"[{DEVICE_NAME}] Error checking sensor health: {e}")
+        logger.error("Error checking sensor health: %s", e)
         return False
 
 
-def _process_sound_detection():
-    """Process sound detection with cooldown period."""
+def _process_sound_detection(home_id: str):
+    """Process sound detection with cooldown period.
+
+    Args:
+        home_id: The ID of the home this sensor belongs to
+    """
     global _last_detection_time
     current_time = time.time()
 
     if current_time - _last_detection_time < DETECTION_COOLDOWN:
         logger.debug(
-            f"[{DEVICE_NAME}] Skipping detection due to cooldown ({DETECTION_COOLDOWN}s)"
+            "Skipping detection due to cooldown (%ss)",
+            DETECTION_COOLDOWN,
         )
         return False
 
     _last_detection_time = current_time
-    logger.info(f"[{DEVICE_NAME}] Sound event detected (Pin {GPIO_PIN_SOUND} active).")
+    logger.info("Sound event detected (Pin %s active).", GPIO_PIN_SOUND)
 
     try:
         if _sound_sensor and _sound_sensor.value is not None:
-            logger.debug(
-                f"[{DEVICE_NAME}] Pin state during detection: {_sound_sensor.value}"
-            )
-
-            update_device_state(DEVICE_ID, "detected")
-
-            device = get_device_by_id(DEVICE_ID)
-            if device:
-                home_id = device.get("home_id")
-                old_state = device.get("current_state", "idle")
-
-                home_mode = get_home_mode(home_id)
-                if home_mode == "away":
-                    insert_event(
-                        home_id=home_id,
-                        device_id=DEVICE_ID,
-                        event_type="sound_changed",
-                        old_state=old_state,
-                        new_state="detected",
-                    )
-                    logger.info(
-                        f"[{DEVICE_NAME}] Sound event logged (home in away mode)"
-                    )
-                else:
-                    logger.debug(
-                        f"[{DEVICE_NAME}] Sound event detected but not logged (home mode: {home_mode})"
-                    )
+            if logger.isEnabledFor(logging.DEBUG):
+                # Reading .value is a GPIO access, so only do it when it will be logged
+                logger.debug(
+                    "Pin state during detection: %s",
+                    _sound_sensor.value,
+                )
+
+            old_state = _device_info.get("current_state", "idle")
+            _device_info["current_state"] = "detected"
+
+            home_mode = get_home_mode(home_id)
+            if home_mode == "away":
+                transition_device_state(
+                    home_id=home_id,
+                    device_id=DEVICE_ID,
+                    event_type="sound_changed",
+                    old_state=old_state,
+                    new_state="detected",
+                )
+                logger.info("Sound event logged (home in away mode)")
+            else:
+                update_device_state(DEVICE_ID, "detected")
+                logger.debug(
+                    "Sound event detected but not logged (home mode: %s)",
+                    home_mode,
+                )
             return True
         else:
             _handle_disconnection()
             return False
 
     except Exception as e:
-        logger.error(f"[{DEVICE_NAME}] Error during sound detection: {e}")
+        logger.error("Error during sound detection: %s", e)
         _handle_disconnection()
         return False
 
 
-def _sound_monitoring_loop():
-    """Internal monitoring loop for sound sensor."""
+def _sound_monitoring_loop(on_sound_detected: Callable[[], bool]):
+    """Internal monitoring loop for sound sensor.
+
+    The pin is only polled outside the detection cooldown. While cooling
+    down, the loop blocks until the cooldown ends or the next health check
+    is due, so a long sound does not cause repeated GPIO reads.
+
+    Args:
+        on_sound_detected: Detection handler with the home context already bound
+    """
     global _last_health_check_time
 
-    logger.info(f"[{DEVICE_NAME}] Sound sensor monitoring loop started.")
+    logger.info("Sound sensor monitoring loop started.")
 
     try:
         while _is_monitoring.is_set():
@@ -172,18 +195,28 @@ def _sound_monitoring_loop():
 
                 if not _check_sensor_health():
                     _handle_disconnection()
-                    time.sleep(1)
+                    _stop_requested.wait(1)
                     continue
 
+            cooldown_remaining = DETECTION_COOLDOWN - (
+                current_time - _last_detection_time
+            )
+            if cooldown_remaining > 0:
+                health_check_due_in = HEALTH_CHECK_INTERVAL - (
+                    current_time - _last_health_check_time
+                )
+                _stop_requested.wait(min(cooldown_remaining, health_check_due_in))
+                continue
+
             if _sound_sensor and _sound_sensor.value:
-                _process_sound_detection()
+                on_sound_detected()
 
-            time.sleep(0.1)
+            _stop_requested.wait(POLL_INTERVAL)
 
     except Exception as e:
-        logger.error(f"[{DEVICE_NAME}] Error in monitoring loop: {e}")
+        logger.error("Error in monitoring loop: %s", e)
     finally:
-        logger.info(f"[{DEVICE_NAME}] Sound sensor monitoring loop ended.")
+        logger.info("Sound sensor monitoring loop ended.")
 
 
 def start_sound_monitoring(home_id: str, user_id: str) -> None:
@@ -193,10 +226,12 @@ def start_sound_monitoring(home_id: str, user_id: str) -> None:
         home_id: The ID of the home this sensor belongs to
         user_id: The ID of the user to notify
     """
-    global _monitoring_thread, _is_monitoring, _sound_sensor, _last_detection_time, _last_health_check_time
+    global _monitoring_thread, _is_monitoring, _sound_sensor, _last_detection_time, _last_health_check_time, _device_info
 
     logger.info(
-        f"[{DEVICE_NAME}] Starting monitoring for HOME_ID: {home_id}, USER_ID: {user_id}"
+        "Starting monitoring for HOME_ID: %s, USER_ID: %s",
+        home_id,
+        user_id,
     )
 
     try:
@@ -205,15 +240,17 @@ def start_sound_monitoring(home_id: str, user_id: str) -> None:
         if _check_sensor_health():
             initial_state = "active" if _sound_sensor.value else "inactive"
             logger.info(
-                f"[{DEVICE_NAME}] Initial sensor state on pin {GPIO_PIN_SOUND}: {initial_state}"
+                "Initial sensor state on pin %s: %s",
+                GPIO_PIN_SOUND,
+                initial_state,
             )
         else:
-            logger.error(f"[{DEVICE_NAME}] Failed initial sensor health check")
+            logger.error("Failed initial sensor health check")
             raise RuntimeError("Sensor health check failed during initialization")
 
-        device = get_device_by_id(DEVICE_ID)
+        device = get_device_by_id(DEVICE_ID, DEVICE_STATE_COLUMNS)
         if not device:
-            logger.info(f"[{DEVICE_NAME}] Device not found in DB. Registering...")
+            logger.info("Device not found in DB. Registering...")
             insert_device(
                 device_id=DEVICE_ID,
                 home_id=home_id,
@@ -221,18 +258,26 @@ def start_sound_monitoring(home_id: str, user_id: str) -> None:
                 type=DEVICE_TYPE,
                 current_state="idle",
             )
+            current_state = "idle"
+        else:
+            current_state = device.get("current_state") or "idle"
+
+        # Queried only once here; event paths read and update this local copy
+        _device_info = {"home_id": home_id, "current_state": current_state}
 
         _last_detection_time = 0
         _last_health_check_time = time.time()
 
+        _stop_requested.clear()
         _is_monitoring.set()
-        _monitoring_thread = threading.Thread(target=_sound_monitoring_loop)
-        _monitoring_thread.daemon = True
-        _monitoring_thread.start()
-        logger.info(f"[{DEVICE_NAME}] Monitoring started successfully.")
+        on_sound_detected = functools.partial(_process_sound_detection, home_id)
+        _monitoring_thread = start_monitoring_thread(
+            _sound_monitoring_loop, on_sound_detected
+        )
+        logger.info("Monitoring started successfully.")
 
     except Exception as e:
-        logger.error(f"[{DEVICE_NAME}] Error starting monitoring: {e}")
+        logger.error("Error starting monitoring: %s", e)
         if _sound_sensor:
             _sound_sensor.close()
             _sound_sensor = None
@@ -243,16 +288,17 @@ def stop_sound_monitoring() -> None:
     """Stop sound monitoring and clean up resources."""
     global _is_monitoring, _monitoring_thread, _sound_sensor
 
-    logger.info(f"[{DEVICE_NAME}] Stopping monitoring...")
+    logger.info("Stopping monitoring...")
     _is_monitoring.clear()
+    _stop_requested.set()
 
     if _monitoring_thread and _monitoring_thread.is_alive():
         _monitoring_thread.join(timeout=2.0)
         if _monitoring_thread.is_alive():
-            logger.warning(f"[{DEVICE_NAME}] Monitoring thread did not finish in time.")
+            logger.warning("Monitoring thread did not finish in time.")
 
     if _sound_sensor:
         _sound_sensor.close()
         _sound_sensor = None
 
-    logger.info(f"[{DEVICE_NAME}] Monitoring stopped and resources cleaned up.")
+    logger.info("Monitoring stopped and resources cleaned up.")
@@ -40,10 +40,29 @@ from src.utils.logger import logger
 CLOUDFLARE_ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID")
 
 R2_BUCKET_NAME = "smart-home"
-R2_ENDPOINT_URL = os.getenv(
-    "R2_ENDPOINT_URL",
-    "https://72fa41884795a1310a5f1c0354a8b3f0.r2.cloudflarestorage.com",
+R2_DEFAULT_ENDPOINT_URL = (
+    "https://72fa41884795a1310a5f1c0354a8b3f0.r2.cloudflarestorage.com"
 )
+R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL", R2_DEFAULT_ENDPOINT_URL)
+R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
+R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
+
+
+def init_r2_config() -> None:
+    """Snapshot the R2 configuration from the environment.
+
+    Must be called once after load_dotenv() so that values from the .env
+    file are picked up. The values never change at runtime, so
+    get_r2_client() reads these module globals instead of calling
+    os.getenv() on every upload.
+    """
+    global CLOUDFLARE_ACCOUNT_ID, R2_ENDPOINT_URL
+    global R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY
+
+    CLOUDFLARE_ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID")
+    R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL", R2_DEFAULT_ENDPOINT_URL)
+    R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
+    R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
 
 
 def get_r2_client():
@@ -54,16 +73,12 @@ def get_r2_client():
 
     Note:
         - Creates new client instance per call
-        - Validates required environment variables
+        - Uses the configuration snapshot taken by init_r2_config()
         - Uses S3-compatible API
         - Implements connection pooling
     """
-    # Fetch keys here, after load_dotenv() from main.py has run
-    r2_access_key_id = os.getenv("R2_ACCESS_KEY_ID")
-    r2_secret_access_key = os.getenv("R2_SECRET_ACCESS_KEY")
-
     # Ensure required environment variables are present for client creation
-    if not R2_ENDPOINT_URL or not r2_access_key_id or not r2_secret_access_key:
+    if not R2_ENDPOINT_URL or not R2_ACCESS_KEY_ID or not R2_SECRET_ACCESS_KEY:
         logger.error(
             "[Cloudflare] R2 client environment variables (ENDPOINT, KEY_ID, ACCESS_KEY) not fully configured."
         )
@@ -71,20 +86,20 @@ def get_r2_client():
         missing_vars = []
         if not R2_ENDPOINT_URL:
             missing_vars.append("R2_ENDPOINT_URL")
-        if not r2_access_key_id:
+        if not R2_ACCESS_KEY_ID:
             missing_vars.append("R2_ACCESS_KEY_ID")
-        if not r2_secret_access_key:
+        if not R2_SECRET_ACCESS_KEY:
             missing_vars.append("R2_SECRET_ACCESS_KEY")
         logger.error(
-            f"[Cloudflare] Missing environment variables: {', '.join(missing_vars)}"
+            "[Cloudflare] Missing environment variables: %s", ", ".join(missing_vars)
         )
         return None
 
     return boto3.client(
         "s3",
         endpoint_url=R2_ENDPOINT_URL,
-        aws_access_key_id=r2_access_key_id,
-        aws_secret_access_key=r2_secret_access_key,
+        aws_access_key_id=R2_ACCESS_KEY_ID,
+        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
     )
 
 
@@ -110,7 +125,7 @@ def upload_file_to_r2(local_file_path: str, remote_file_name: str = None) -> boo
         - Uses global bucket configuration
     """
     if not os.path.exists(local_file_path):
-        logger.error(f"[Cloudflare] File not found: {local_file_path}")
+        logger.error("[Cloudflare] File not found: %s", local_file_path)
         return False
 
     try:
@@ -119,19 +134,18 @@ def upload_file_to_r2(local_file_path: str, remote_file_name: str = None) -> boo
             logger.error("[Cloudflare] Failed to get R2 client, cannot upload.")
             return False
 
-        # Use the global constant for bucket name
-        bucket_name = R2_BUCKET_NAME
-
         if not remote_file_name:
-            remote_file_name = f"{os.path.basename(local_file_path)}"
+            remote_file_name = os.path.basename(local_file_path)
 
-        client.upload_file(local_file_path, bucket_name, remote_file_name)
+        client.upload_file(local_file_path, R2_BUCKET_NAME, remote_file_name)
 
         logger.info(
-            f"[Cloudflare] Successfully uploaded {local_file_path} to R2 as {remote_file_name}"
+            "[Cloudflare] Successfully uploaded %s to R2 as %s",
+            local_file_path,
+            remote_file_name,
         )
         return True
 
     except Exception as e:
-        logger.error(f"[Cloudflare] Error uploading file to R2: {str(e)}")
+        logger.error("[Cloudflare] Error uploading file to R2: %s", e)
         return False
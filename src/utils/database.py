@@ -41,46 +41,504 @@ Database Schema:
         - updated_at: Timestamp
 
 Features:
-    - Connection pooling
+    - Connection pooling with keep-alive and periodic health checks
     - Transaction support
     - Error handling
     - State management
     - Event logging
     - Alert generation
+    - Batched background writes for events and alerts, optionally via
+      Postgres COPY over a direct connection (SUPABASE_DB_URL)
+    - Atomic state transitions through the device_transition RPC
 
 Dependencies:
     - supabase: For database operations
+    - orjson: For request body serialization
+    - psycopg (optional): For COPY writes over a direct connection
     - dotenv: For configuration
     - logger: For operation logging
 """
 
+import atexit
 import os
-from datetime import datetime, timezone
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-from dotenv import load_dotenv
+import httpx
+import orjson
+from postgrest.exceptions import APIError
+from postgrest.utils import SyncClient
 from supabase import Client, create_client
 
 from src.utils.logger import logger
 
-load_dotenv()
-
 # Database configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Optional direct Postgres connection string used for bulk COPY writes
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
 
 # Initialize Supabase client
 if not all([SUPABASE_URL, SUPABASE_KEY]):
     raise ValueError("Missing Supabase configuration in environment variables")
 
-_supabase: Optional[Client] = create_client(SUPABASE_URL, SUPABASE_KEY)
+# HTTP connection pool for PostgREST requests
+POOL_MAX_CONNECTIONS = 10
+POOL_MAX_KEEPALIVE_CONNECTIONS = 5
+POOL_KEEPALIVE_EXPIRY = 1800.0  # seconds
+HEALTH_CHECK_INTERVAL = 300.0  # seconds between connection health checks
+
+
+class _OrjsonSyncClient(SyncClient):
+    """PostgREST session that serializes JSON request bodies with orjson.
+
+    httpx encodes the json= argument with the stdlib json module; orjson
+    produces a compact UTF-8 body in C and writes datetime values
+    as RFC 3339 strings directly.
+    """
+
+    def request(self, method, url, *, json=None, content=None, headers=None, **kwargs):
+        if json is not None:
+            content = orjson.dumps(json)
+            headers = httpx.Headers(headers)
+            headers["Content-Type"] = "application/json"
+        return super().request(method, url, content=content, headers=headers, **kwargs)
+
+
+def _create_supabase_client() -> Client:
+    """Create a Supabase client whose PostgREST session has bounded pool limits.
+
+    The default session is rebuilt with the same base URL, headers and
+    timeout, but with explicit keep-alive limits so connections stay warm
+    between sensor events instead of being re-handshaked, and with request
+    bodies encoded by orjson.
+    """
+    client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    default_session = client.postgrest.session
+    client.postgrest.session = _OrjsonSyncClient(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=default_session.timeout,
+        follow_redirects=True,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+    )
+    default_session.close()
+    return client
+
+
+_supabase: Optional[Client] = _create_supabase_client()
+
+
+def get_supabase_client() -> Client:
+    """Get the process-wide Supabase client.
+
+    Returns:
+        Client: The shared client; the only one created by this process
+
+    Note:
+        - Returns the current client, which may have been recreated by the
+          connection health check
+    """
+    return _supabase
+
+
+def _warm_connection() -> None:
+    """Open the pooled TLS/HTTP2 connection before the first real request."""
+    try:
+        _supabase.table("devices").select("id").limit(1).execute()
+        logger.debug("Supabase connection warmed up")
+    except Exception as e:
+        logger.debug("Supabase connection warm-up failed: %s", e)
+
+
+# Set SMART_HOME_WARMUP=0 to skip the import-time warm-up (e.g. in tests)
+if os.getenv("SMART_HOME_WARMUP", "1") == "1":
+    threading.Thread(target=_warm_connection, name="db-warmup", daemon=True).start()
+
+
+_health_check_thread: Optional[threading.Thread] = None
+_health_check_stop = threading.Event()
+
+
+def _connection_health_check_loop() -> None:
+    """Periodically ping the database and recycle the client on failure."""
+    global _supabase
+    while not _health_check_stop.wait(HEALTH_CHECK_INTERVAL):
+        try:
+            _supabase.table("devices").select("id").limit(1).execute()
+        except Exception as e:
+            logger.warning("DB health check failed: %s. Recreating Supabase client.", e)
+            try:
+                _supabase = _create_supabase_client()
+            except Exception as e_create:
+                logger.error("Failed to recreate Supabase client: %s", e_create)
+
+
+def start_connection_health_check() -> None:
+    """Start the background thread that keeps the pooled connection healthy.
+
+    Note:
+        - Idempotent; does nothing if the thread is already running
+        - Pings every HEALTH_CHECK_INTERVAL seconds
+    """
+    global _health_check_thread
+    if _health_check_thread and _health_check_thread.is_alive():
+        return
+    _health_check_stop.clear()
+    _health_check_thread = threading.Thread(
+        target=_connection_health_check_loop, name="db-health-check", daemon=True
+    )
+    _health_check_thread.start()
+
+
+def stop_connection_health_check() -> None:
+    """Stop the connection health check thread."""
+    _health_check_stop.set()
+
+
+# Read-through cache for lookups that rarely change
+CACHE_TTL_SECONDS = 30.0
+# Home -> user associations only change when a home is re-assigned
+USER_ID_CACHE_TTL_SECONDS = 300.0
+CACHE_MAX_SIZE = 256
+
+# Column lists for get_device_by_id callers that only need part of the row
+DEVICE_STATE_COLUMNS = "current_state"
+DEVICE_STATE_BRIGHTNESS_COLUMNS = "current_state,brightness"
+
+_cache_lock = threading.RLock()
+# Keyed by device ID for full rows, "<device ID>|<columns>" for narrow selects
+_device_cache: dict[str, tuple[float, dict]] = {}
+_home_mode_cache: dict[str, tuple[float, str]] = {}
+_user_id_cache: dict[str, tuple[float, str]] = {}
+# Last current_state written by this process, used to skip no-op updates
+_last_state_cache: dict[str, tuple[float, str]] = {}
+# Devices whose current_state has been read once to seed _last_state_cache
+_seeded_state_devices: set[str] = set()
+
+
+def _cache_get(cache: dict, key: str):
+    """Return the cached value for key, or None if missing or expired."""
+    with _cache_lock:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del cache[key]
+            return None
+        return value
+
+
+def _cache_set(cache: dict, key: str, value, ttl: float = CACHE_TTL_SECONDS) -> None:
+    """Store value for key, evicting the oldest entry when the cache is full."""
+    with _cache_lock:
+        if key not in cache and len(cache) >= CACHE_MAX_SIZE:
+            cache.pop(next(iter(cache)))
+        cache[key] = (time.monotonic() + ttl, value)
+
+
+def _cache_invalidate(cache: dict, key: str) -> None:
+    """Drop key from the cache so the next lookup hits the database."""
+    with _cache_lock:
+        cache.pop(key, None)
+
+
+def _device_cache_key(device_id: str, columns: str) -> str:
+    """Return the _device_cache key for a device row fetched with columns."""
+    return device_id if columns == "*" else f"{device_id}|{columns}"
+
+
+def _invalidate_device(device_id: str) -> None:
+    """Drop the full and any column-subset cached rows for a device."""
+    prefix = f"{device_id}|"
+    with _cache_lock:
+        for key in [k for k in _device_cache if k == device_id or k.startswith(prefix)]:
+            del _device_cache[key]
+
+
+# Background batching for append-only inserts (event_log, alert_log)
+WRITE_BATCH_SIZE = 100
+WRITE_FLUSH_INTERVAL = 0.25  # seconds to wait for more rows before flushing
+WRITE_MAX_ATTEMPTS = 4
+WRITE_RETRY_BASE_DELAY = 0.5  # seconds, doubled after each failed attempt
+WRITE_SHUTDOWN_TIMEOUT = 10.0
+WRITE_MAX_IN_FLIGHT = 4  # concurrent requests multiplexed over the HTTP/2 session
+
+_FLUSH_STOP = object()
+# SimpleQueue is implemented in C; put() is a single call with no Condition
+# round trip, which keeps insert_event/insert_alert cheap for the callers
+_write_queue: queue.SimpleQueue = queue.SimpleQueue()
+_flush_thread: Optional[threading.Thread] = None
+_flush_thread_lock = threading.Lock()
+_write_executor = ThreadPoolExecutor(
+    max_workers=WRITE_MAX_IN_FLIGHT, thread_name_prefix="db-write"
+)
+
+
+# Direct Postgres COPY for batched writes, enabled by SUPABASE_DB_URL
+COPY_POOL_MIN_SIZE = 1
+COPY_COLUMNS = {
+    "event_log": (
+        "home_id",
+        "device_id",
+        "event_type",
+        "old_state",
+        "new_state",
+        "read",
+        "created_at",
+    ),
+    "alert_log": (
+        "home_id",
+        "user_id",
+        "device_id",
+        "message",
+        "sent_status",
+        "dismissed",
+        "created_at",
+    ),
+}
+
+_copy_pool = None
+_copy_pool_lock = threading.Lock()
+_copy_pool_checked = False
+
 
+def _get_copy_pool():
+    """Return the psycopg connection pool for COPY writes, or None if disabled.
 
-def get_device_by_id(device_id: str) -> Optional[dict]:
+    The pool is created on first use from the flush thread. COPY is only
+    used when SUPABASE_DB_URL is set, psycopg is installed and the pool
+    opens; otherwise batches keep going through PostgREST.
+    """
+    global _copy_pool, _copy_pool_checked
+
+    with _copy_pool_lock:
+        if _copy_pool_checked:
+            return _copy_pool
+        _copy_pool_checked = True
+        if not SUPABASE_DB_URL:
+            return None
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            logger.warning(
+                "SUPABASE_DB_URL is set but psycopg is not installed, "
+                "using PostgREST for batched writes"
+            )
+            return None
+        try:
+            _copy_pool = ConnectionPool(
+                SUPABASE_DB_URL,
+                min_size=COPY_POOL_MIN_SIZE,
+                max_size=WRITE_MAX_IN_FLIGHT,
+                open=True,
+            )
+        except Exception as e:
+            logger.warning(
+                "Could not open the COPY connection pool: %s. "
+                "Using PostgREST for batched writes",
+                e,
+            )
+            return None
+        atexit.register(_copy_pool.close)
+        return _copy_pool
+
+
+def _copy_rows(pool, table: str, rows: list[dict]) -> None:
+    """Write rows into table with a single COPY FROM STDIN."""
+    columns = COPY_COLUMNS[table]
+    with pool.connection() as conn, conn.cursor() as cur:
+        with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([row.get(column) for column in columns])
+
+
+def _write_batch(table: str, rows: list[dict]) -> None:
+    """Insert rows into table in a single request, retrying with backoff.
+
+    Uses Postgres COPY when a direct connection is configured and the table
+    has a known column layout, and a PostgREST bulk insert otherwise. A
+    failed COPY is not retried; the rows go through PostgREST instead.
+    """
+    pool = _get_copy_pool() if table in COPY_COLUMNS else None
+    if pool is not None:
+        try:
+            _copy_rows(pool, table, rows)
+            logger.info("Copied %s row(s) into %s", len(rows), table)
+            return
+        except Exception as e:
+            logger.warning(
+                "DB COPY error (%s): %s. Falling back to PostgREST.", table, e
+            )
+
+    delay = WRITE_RETRY_BASE_DELAY
+    for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+        try:
+            _supabase.table(table).insert(rows).execute()
+            logger.info("Inserted %s row(s) into %s", len(rows), table)
+            return
+        except Exception as e:
+            if attempt == WRITE_MAX_ATTEMPTS:
+                logger.error(
+                    "DB batch insert error (%s): %s. Dropping %s row(s).",
+                    table,
+                    e,
+                    len(rows),
+                )
+                return
+            logger.warning(
+                "DB batch insert error (%s), attempt %s/%s: %s. Retrying in %ss.",
+                table,
+                attempt,
+                WRITE_MAX_ATTEMPTS,
+                e,
+                delay,
+            )
+            time.sleep(delay)
+            delay *= 2
+
+
+# (second, "YYYY-MM-DDTHH:MM:SS") for the most recently formatted second,
+# swapped as one tuple so concurrent callers never see a torn pair
+_iso_prefix_cache: tuple[int, str] = (-1, "")
+
+
+def _format_utc_iso(timestamp_ns: int) -> str:
+    """Format a time.time_ns() value as an ISO 8601 UTC timestamp.
+
+    Produces the same text as datetime.isoformat() for an aware UTC
+    datetime with microseconds. The date/time prefix is only rebuilt when
+    the second changes, so timestamps within the same second share it.
+    Thread-safe.
+    """
+    global _iso_prefix_cache
+    second, remainder_ns = divmod(timestamp_ns, 1_000_000_000)
+    cached_second, prefix = _iso_prefix_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _iso_prefix_cache = (second, prefix)
+    return f"{prefix}.{remainder_ns // 1000:06d}+00:00"
+
+
+def _now_utc_iso() -> str:
+    """Return the current time as an ISO 8601 UTC timestamp."""
+    return _format_utc_iso(time.time_ns())
+
+
+def _flush_batch(batch: list) -> None:
+    """Group queued (table, row, timestamp_ns) items by table and write each group.
+
+    Timestamps are formatted here, on the flush thread, rather than by the
+    sensor threads that queued the rows. When several tables have pending
+    rows, their inserts are issued concurrently so they share one round trip
+    on the HTTP/2 session instead of running back to back; at interpreter
+    shutdown they are written one after another on this thread.
+    """
+    rows_by_table: dict[str, list[dict]] = {}
+    for table, row, timestamp_ns in batch:
+        # Queued rows are owned by the write path, so stamp them in place
+        # rather than copying every row into a new dict
+        row["created_at"] = _format_utc_iso(timestamp_ns)
+        rows_by_table.setdefault(table, []).append(row)
+    if len(rows_by_table) == 1:
+        _write_batch(*next(iter(rows_by_table.items())))
+        return
+    futures = []
+    for table, rows in rows_by_table.items():
+        try:
+            futures.append(_write_executor.submit(_write_batch, table, rows))
+        except RuntimeError:
+            # The executor takes no new work once the interpreter is shutting
+            # down (the atexit flush), so write this table inline instead
+            _write_batch(table, rows)
+    for future in futures:
+        future.result()
+
+
+def _flush_loop() -> None:
+    """Drain the write queue, coalescing rows into batched inserts."""
+    stopping = False
+    while not stopping:
+        batch = []
+        item = _write_queue.get()
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while True:
+            if item is _FLUSH_STOP:
+                stopping = True
+            else:
+                batch.append(item)
+            if len(batch) >= WRITE_BATCH_SIZE:
+                break
+            # On shutdown, take whatever is left without waiting
+            timeout = 0 if stopping else deadline - time.monotonic()
+            try:
+                item = (
+                    _write_queue.get(timeout=timeout)
+                    if timeout > 0
+                    else _write_queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+        if batch:
+            _flush_batch(batch)
+
+
+def _flush_remaining() -> None:
+    """Stop the flush thread and write any rows still queued."""
+    thread = _flush_thread
+    if thread is None or not thread.is_alive():
+        return
+    _write_queue.put(_FLUSH_STOP)
+    thread.join(timeout=WRITE_SHUTDOWN_TIMEOUT)
+    if thread.is_alive():
+        logger.warning("DB flush thread did not finish writing queued rows in time.")
+
+
+# Registered once; a no-op when the flush thread was never started
+atexit.register(_flush_remaining)
+
+
+def _enqueue_insert(table: str, row: dict) -> None:
+    """Queue a row for a batched insert, starting the flush thread if needed.
+
+    The row's created_at is captured now as time.time_ns() and formatted
+    when the batch is flushed.
+    """
+    global _flush_thread
+    if _flush_thread is None or not _flush_thread.is_alive():
+        with _flush_thread_lock:
+            if _flush_thread is None or not _flush_thread.is_alive():
+                _flush_thread = threading.Thread(
+                    target=_flush_loop, name="db-flush", daemon=True
+                )
+                _flush_thread.start()
+    _write_queue.put((table, row, time.time_ns()))
+
+
+def invalidate_home_cache(home_id: str) -> None:
+    """Drop cached mode and user lookups for a home.
+
+    Call this from any path that changes a home's mode or user association.
+    """
+    _cache_invalidate(_home_mode_cache, home_id)
+    _cache_invalidate(_user_id_cache, home_id)
+
+
+def get_device_by_id(device_id: str, columns: str = "*") -> Optional[dict]:
     """Get device information by ID.
 
     Args:
         device_id: The unique identifier of the device
+        columns: Comma-separated columns to select, e.g. DEVICE_STATE_COLUMNS
 
     Returns:
         Optional[dict]: Device data if found, None otherwise
@@ -89,34 +547,80 @@ def get_device_by_id(device_id: str) -> Optional[dict]:
         Exception: If database query fails
 
     Note:
-        - Returns full device record
-        - Includes current state
+        - Returns the full device record unless columns narrows the select
+        - A cached full record also answers narrower lookups
+        - Cached for CACHE_TTL_SECONDS
         - Thread-safe operation
     """
     if not device_id:
         logger.error("Error: device_id is required to fetch a device.")
         return None
+    cached = _cache_get(_device_cache, device_id)
+    if cached is None and columns != "*":
+        cached = _cache_get(_device_cache, _device_cache_key(device_id, columns))
+    if cached is not None:
+        return cached
     try:
         response = (
             _supabase.table("devices")
-            .select("*")
+            .select(columns)
             .eq("id", device_id)
             .limit(1)
             .execute()
         )
         if response.data:
-            logger.info(f"Device found with id '{device_id}': {response.data[0]}")
+            logger.info("Device found with id '%s': %s", device_id, response.data[0])
+            _cache_set(
+                _device_cache, _device_cache_key(device_id, columns), response.data[0]
+            )
             return response.data[0]
         else:
-            logger.error(f"No device found with id '{device_id}'.")
+            logger.error("No device found with id '%s'.", device_id)
             return None
     except Exception as e:
         logger.error(
-            f"DB query error (devices - get_device_by_id for {device_id}): {e}"
+            "DB query error (devices - get_device_by_id for %s): %s", device_id, e
         )
         return None
 
 
+def get_devices_by_ids(device_ids: list[str]) -> dict[str, dict]:
+    """Get several devices in a single query.
+
+    Args:
+        device_ids: The unique identifiers of the devices
+
+    Returns:
+        dict[str, dict]: Device data keyed by device ID; missing devices are omitted
+
+    Note:
+        - Serves cached devices from memory and fetches the rest with one in_() query
+        - Thread-safe operation
+    """
+    devices: dict[str, dict] = {}
+    missing_ids = []
+    for device_id in dict.fromkeys(device_ids):
+        cached = _cache_get(_device_cache, device_id)
+        if cached is not None:
+            devices[device_id] = cached
+        else:
+            missing_ids.append(device_id)
+
+    if not missing_ids:
+        return devices
+
+    try:
+        response = (
+            _supabase.table("devices").select("*").in_("id", missing_ids).execute()
+        )
+        for row in response.data or []:
+            _cache_set(_device_cache, row["id"], row)
+            devices[row["id"]] = row
+    except Exception as e:
+        logger.error("DB query error (devices - get_devices_by_ids): %s", e)
+    return devices
+
+
 def insert_device(
     device_id: str,
     home_id: str,
@@ -147,7 +651,7 @@ def insert_device(
         - Thread-safe operation
     """
     try:
-        now_iso = datetime.now(timezone.utc).isoformat()
+        now_iso = _now_utc_iso()
         device_data = {
             "id": device_id,
             "home_id": home_id,
@@ -161,13 +665,53 @@ def insert_device(
         }
 
         response = _supabase.table("devices").insert(device_data).execute()
-        logger.info(f"Device inserted into devices table: {response.data}")
+        _invalidate_device(device_id)
+        _cache_invalidate(_last_state_cache, device_id)
+        logger.info("Device inserted into devices table: %s", response.data)
         return response.data[0] if response.data else {}
     except Exception as e:
-        logger.error(f"DB insert error (devices): {e}")
+        logger.error("DB insert error (devices): %s", e)
         return {"error": str(e)}
 
 
+def _known_device_state(device_id: str) -> str | None:
+    """Return the device's current_state as last written by this process.
+
+    The first lookup for a device reads current_state straight from the
+    database to seed _last_state_cache; cached device rows are never used,
+    since another writer may have changed the device since they were fetched.
+    """
+    state = _cache_get(_last_state_cache, device_id)
+    if state is not None:
+        return state
+
+    with _cache_lock:
+        if device_id in _seeded_state_devices:
+            return None
+        _seeded_state_devices.add(device_id)
+
+    try:
+        response = (
+            _supabase.table("devices")
+            .select(DEVICE_STATE_COLUMNS)
+            .eq("id", device_id)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        with _cache_lock:
+            _seeded_state_devices.discard(device_id)  # Retry on the next update
+        logger.error("DB query error (devices - state seed for %s): %s", device_id, e)
+        return None
+    if not response.data:
+        return None
+    state = response.data[0].get("current_state")
+    if isinstance(state, str):
+        _cache_set(_last_state_cache, device_id, state)
+        return state
+    return None
+
+
 def update_device_state(device_id: str, new_state: str | dict) -> None:
     """Update a device's current state.
 
@@ -183,11 +727,19 @@ def update_device_state(device_id: str, new_state: str | dict) -> None:
 
     Note:
         - Updates timestamp
+        - Skips the request when a string state matches the state this process
+          last wrote (seeded from one current_state read per device)
         - Validates state transition
         - Thread-safe operation
     """
+    if isinstance(new_state, str) and _known_device_state(device_id) == new_state:
+        logger.debug(
+            "Device %s already in state %s, skipping update", device_id, new_state
+        )
+        return
+
     try:
-        now_iso = datetime.now(timezone.utc).isoformat()
+        now_iso = _now_utc_iso()
         if isinstance(new_state, str):
             update_data = {
                 "current_state": new_state,
@@ -199,9 +751,15 @@ def update_device_state(device_id: str, new_state: str | dict) -> None:
         response = (
             _supabase.table("devices").update(update_data).eq("id", device_id).execute()
         )
-        logger.info(f"Device state updated: {response.data}")
+        _invalidate_device(device_id)
+        if isinstance(new_state, str):
+            _cache_set(_last_state_cache, device_id, new_state)
+        else:
+            _cache_invalidate(_last_state_cache, device_id)
+        logger.info("Device state updated: %s", response.data)
     except Exception as e:
-        logger.error(f"DB update error (devices): {e}")
+        _cache_invalidate(_last_state_cache, device_id)
+        logger.error("DB update error (devices): %s", e)
 
 
 def insert_event(
@@ -222,32 +780,23 @@ def insert_event(
         new_state: The new state
 
     Returns:
-        dict: Event data if insertion successful, error message otherwise
-
-    Raises:
-        Exception: If database operation fails
+        dict: The queued event data (created_at is added when flushed)
 
     Note:
-        - Sets event timestamp
-        - Validates state values
+        - Captures event timestamp at call time
+        - Written asynchronously in batches by the flush thread
         - Thread-safe operation
     """
-    try:
-        event_data = {
-            "home_id": home_id,
-            "device_id": device_id,
-            "event_type": event_type,
-            "old_state": old_state,
-            "new_state": new_state,
-            "read": read,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-        response = _supabase.table("event_log").insert(event_data).execute()
-        logger.info(f"Event inserted into event_log: {response.data}")
-        return response.data[0] if response.data else {}
-    except Exception as e:
-        logger.error(f"DB insert error (event_log): {e}")
-        return {"error": str(e)}
+    event_data = {
+        "home_id": home_id,
+        "device_id": device_id,
+        "event_type": event_type,
+        "old_state": old_state,
+        "new_state": new_state,
+        "read": read,
+    }
+    _enqueue_insert("event_log", event_data)
+    return event_data
 
 
 def insert_alert(
@@ -267,32 +816,103 @@ def insert_alert(
         message: The alert message
 
     Returns:
-        dict: Alert data if insertion successful, error message otherwise
+        dict: The queued alert data (created_at is added when flushed)
 
-    Raises:
-        Exception: If database operation fails
+    Note:
+        - Captures alert timestamp at call time
+        - Written asynchronously in batches by the flush thread
+        - Thread-safe operation
+    """
+    alert_data = {
+        "home_id": home_id,
+        "user_id": user_id,
+        "device_id": device_id,
+        "message": message,
+        "sent_status": sent_status,
+        "dismissed": dismissed,
+    }
+    _enqueue_insert("alert_log", alert_data)
+    return alert_data
+
+
+DEVICE_TRANSITION_RPC = "device_transition"
+RPC_NOT_FOUND_CODE = "PGRST202"  # PostgREST: function missing from schema cache
+_device_transition_rpc_available = True
+
+
+def transition_device_state(
+    home_id: str,
+    device_id: str,
+    event_type: str,
+    old_state: str | None,
+    new_state: str,
+) -> None:
+    """Update a device's state and log the change in one server-side transaction.
+
+    Args:
+        home_id: The home where the event occurred
+        device_id: The device that changed state
+        event_type: The type of event
+        old_state: The previous state
+        new_state: The new state
+
+    Returns:
+        None
 
     Note:
-        - Sets alert timestamp
-        - Validates message length
+        - One round trip to the device_transition Postgres function
+        - Falls back to update_device_state + insert_event when the
+          function has not been deployed (see DEPLOYMENT.md) or the call fails
         - Thread-safe operation
     """
-    try:
-        alert_data = {
-            "home_id": home_id,
-            "user_id": user_id,
-            "device_id": device_id,
-            "message": message,
-            "sent_status": sent_status,
-            "dismissed": dismissed,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-        response = _supabase.table("alert_log").insert(alert_data).execute()
-        logger.info(f"Alert inserted into alert_log: {response.data}")
-        return response.data[0] if response.data else {}
-    except Exception as e:
-        logger.error(f"DB insert error (alert_log): {e}")
-        return {"error": str(e)}
+    global _device_transition_rpc_available
+
+    if _device_transition_rpc_available:
+        try:
+            response = _supabase.rpc(
+                DEVICE_TRANSITION_RPC,
+                {
+                    "p_id": device_id,
+                    "p_home_id": home_id,
+                    "p_event_type": event_type,
+                    "p_old": old_state,
+                    "p_new": new_state,
+                },
+            ).execute()
+            _invalidate_device(device_id)
+            _cache_set(_last_state_cache, device_id, new_state)
+            logger.info("Device transition recorded: %s", response.data)
+            return
+        except APIError as e:
+            if e.code != RPC_NOT_FOUND_CODE:
+                logger.error(
+                    "DB rpc error (%s): %s, falling back to separate update and insert",
+                    DEVICE_TRANSITION_RPC,
+                    e,
+                )
+            else:
+                _device_transition_rpc_available = False
+                logger.warning(
+                    "%s function not found, falling back to separate update and insert",
+                    DEVICE_TRANSITION_RPC,
+                )
+        except Exception as e:
+            logger.error(
+                "DB rpc error (%s): %s, falling back to separate update and insert",
+                DEVICE_TRANSITION_RPC,
+                e,
+            )
+
+    # update_device_state logs its own failures and insert_event goes through
+    # the retrying insert queue, so the event survives a transient error
+    update_device_state(device_id, new_state)
+    insert_event(
+        home_id=home_id,
+        device_id=device_id,
+        event_type=event_type,
+        old_state=old_state,
+        new_state=new_state,
+    )
 
 
 def get_home_mode(home_id: str) -> str | None:
@@ -312,6 +932,9 @@ def get_home_mode(home_id: str) -> str | None:
         - Thread-safe operation
         - Handles missing homes
     """
+    cached = _cache_get(_home_mode_cache, home_id)
+    if cached is not None:
+        return cached
     try:
         response = (
             _supabase.table("user_homes")
@@ -321,12 +944,17 @@ def get_home_mode(home_id: str) -> str | None:
             .execute()
         )
         if response.data:
-            return response.data[0].get("mode")
+            mode = response.data[0].get("mode")
+            if mode is not None:
+                _cache_set(_home_mode_cache, home_id, mode)
+            return mode
         else:
-            logger.error(f"No mode found for home_id: {home_id}")
+            logger.error("No mode found for home_id: %s", home_id)
             return None
     except Exception as e:
-        logger.error(f"DB query error (user_homes - get_home_mode for {home_id}): {e}")
+        logger.error(
+            "DB query error (user_homes - get_home_mode for %s): %s", home_id, e
+        )
         return None
 
 
@@ -343,10 +971,10 @@ def get_device_state(device_id: str) -> str | None:
         if response.data:
             return response.data[0].get("current_state")
         else:
-            logger.error(f"No state found for device_id: {device_id}")
+            logger.error("No state found for device_id: %s", device_id)
             return None
     except Exception as e:
-        logger.error(f"DB query error (devices - get_device_state): {e}")
+        logger.error("DB query error (devices - get_device_state): %s", e)
         return None
 
 
@@ -364,9 +992,13 @@ def get_user_id_for_home(home_id: str) -> str | None:
 
     Note:
         - Returns primary user only
+        - Cached for USER_ID_CACHE_TTL_SECONDS; see invalidate_home_cache()
         - Thread-safe operation
         - Handles missing associations
     """
+    cached = _cache_get(_user_id_cache, home_id)
+    if cached is not None:
+        return cached
     try:
         response = (
             _supabase.table("user_homes")
@@ -377,20 +1009,25 @@ def get_user_id_for_home(home_id: str) -> str | None:
         if response.data:
             user_id = response.data[0].get("user_id")
             if user_id:
-                logger.info(f"Found user_id: {user_id} for HOME_ID: {home_id}")
+                logger.info("Found user_id: %s for HOME_ID: %s", user_id, home_id)
+                _cache_set(
+                    _user_id_cache, home_id, user_id, ttl=USER_ID_CACHE_TTL_SECONDS
+                )
                 return user_id
             else:
                 logger.error(
-                    f"Error: 'user_id' field not found in response for HOME_ID: {home_id}. Data: {response.data[0]}"
+                    "Error: 'user_id' field not found in response for HOME_ID: %s. Data: %s",
+                    home_id,
+                    response.data[0],
                 )
                 return None
         else:
             logger.error(
-                f"No user_id found for HOME_ID: {home_id} in user_homes table."
+                "No user_id found for HOME_ID: %s in user_homes table.", home_id
             )
             return None
     except Exception as e:
-        logger.error(f"DB query error (user_homes - get_user_id_for_home): {e}")
+        logger.error("DB query error (user_homes - get_user_id_for_home): %s", e)
         return None
 
 
@@ -411,5 +1048,88 @@ def get_latest_device_state(home_id: str, device_id: str) -> str | None:
         else:
             return None
     except Exception as e:
-        logger.error(f"DB query error (_get_latest_device_state for {device_id}): {e}")
+        logger.error(
+            "DB query error (_get_latest_device_state for %s): %s", device_id, e
+        )
+        return None
+
+
+def get_latest_device_states(
+    home_id: str, device_ids: list[str]
+) -> dict[str, str | None]:
+    """Fetch the most recent 'new_state' for several devices in a single query.
+
+    Args:
+        home_id: The home whose events should be considered
+        device_ids: The devices to look up
+
+    Returns:
+        dict[str, str | None]: Latest state keyed by device ID; devices without
+            events map to None
+    """
+    latest_states: dict[str, str | None] = dict.fromkeys(device_ids)
+    if not device_ids:
+        return latest_states
+    try:
+        # The embedded limit applies per device, so only one event row is
+        # returned for each ID regardless of how long the event log is.
+        response = (
+            _supabase.table("devices")
+            .select("id, event_log(new_state)")
+            .in_("id", list(latest_states))
+            .eq("event_log.home_id", home_id)
+            .order("created_at", desc=True, foreign_table="event_log")
+            .limit(1, foreign_table="event_log")
+            .execute()
+        )
+        for row in response.data or []:
+            events = row.get("event_log") or []
+            latest_states[row["id"]] = events[0].get("new_state") if events else None
+    except Exception as e:
+        logger.error("DB query error (event_log - get_latest_device_states): %s", e)
+    return latest_states
+
+
+def get_device_with_latest_state(home_id: str, device_id: str) -> Optional[dict]:
+    """Fetch a device and its most recent event state in a single request.
+
+    Uses a PostgREST embedded select on the event_log foreign key instead of
+    calling get_device_by_id() and get_latest_device_state() back to back.
+
+    Args:
+        home_id: The home whose events should be considered
+        device_id: The unique identifier of the device
+
+    Returns:
+        Optional[dict]: Device data with an extra 'latest_state' key (None if
+            the device has no events), or None if the device is not found
+
+    Note:
+        - Refreshes the device cache
+        - Thread-safe operation
+    """
+    try:
+        response = (
+            _supabase.table("devices")
+            .select("*, event_log(new_state)")
+            .eq("id", device_id)
+            .eq("event_log.home_id", home_id)
+            .order("created_at", desc=True, foreign_table="event_log")
+            .limit(1, foreign_table="event_log")
+            .limit(1)
+            .execute()
+        )
+        if not response.data:
+            return None
+        device = dict(response.data[0])
+        events = device.pop("event_log", None) or []
+        _cache_set(_device_cache, device_id, dict(device))
+        device["latest_state"] = events[0].get("new_state") if events else None
+        return device
+    except Exception as e:
+        logger.error(
+            "DB query error (devices - get_device_with_latest_state for %s): %s",
+            device_id,
+            e,
+        )
         return None
@@ -9,10 +9,13 @@ Features:
     - Log level coloring
     - Module/function context
     - Console and file output
+    - Non-blocking writes through a background queue listener
+    - Batched, buffered log file writes (flushed at once on ERROR and
+      every few seconds otherwise)
     - Configurable log levels
     - Exception tracebacks
 
-Log Levels:
+Log Levels (set with the LOG_LEVEL environment variable, default INFO):
     - DEBUG: Detailed information for debugging
     - INFO: General operational messages
     - WARNING: Issues that might need attention
@@ -27,36 +30,200 @@ Usage:
     logger.warning("Warning about potential issues")
     logger.error("Error that needs attention")
     logger.critical("Critical system issue")
+
+    # Per-device logger; lines are prefixed with "[Sound Sensor] "
+    logger = get_context_logger("Sound Sensor")
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from logging.handlers import (
+    MemoryHandler,
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+)
+from pathlib import Path
+
+# The formatter only uses asctime, levelname, name and message, so skip
+# collecting caller, thread and process details for every LogRecord
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging._srcfile = None
+
+# Resolve the logs directory at the repository root once, independent of
+# the working directory the service was started from
+LOG_DIR = Path(__file__).resolve().parent.parent.parent / "logs"
+if not LOG_DIR.exists():
+    LOG_DIR.mkdir(exist_ok=True)
+
+
+class FastFormatter(logging.Formatter):
+    """Formatter producing "asctime - levelname - name - message" lines.
+
+    Builds each line with an f-string instead of %-substitution over the
+    record's __dict__, and reuses the formatted timestamp for records
+    created within the same second. Records carrying a context (see
+    get_context_logger) get a "[context] " prefix on the message.
+    """
+
+    default_msec_format = None
+
+    def __init__(self, datefmt: str = "%Y-%m-%d %H:%M:%S") -> None:
+        super().__init__(datefmt=datefmt)
+        self._last_sec = -1
+        self._last_str = ""
+
+    def _cached_time(self, created: float) -> str:
+        """Return the formatted local time for created, cached per second."""
+        sec = int(created)
+        if sec != self._last_sec:
+            self._last_str = time.strftime(self.datefmt, self.converter(sec))
+            self._last_sec = sec
+        return self._last_str
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.message = record.getMessage()
+        context = getattr(record, "context", None)
+        message = f"[{context}] {record.message}" if context else record.message
+        line = (
+            f"{self._cached_time(record.created)} - {record.levelname} - "
+            f"{record.name} - {message}"
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line = f"{line}\n{record.exc_text}"
+        if record.stack_info:
+            line = f"{line}\n{self.formatStack(record.stack_info)}"
+        return line
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that writes through a large buffer.
+
+    StreamHandler flushes after every record; here the stream is only flushed
+    by flush_buffer(), called once per batch by BatchFlushMemoryHandler, and
+    when the file is rotated or closed.
+    """
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=FILE_BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def flush(self) -> None:
+        pass
+
+    def flush_buffer(self) -> None:
+        """Write buffered log lines to the file."""
+        with self.lock:
+            if self.stream is not None:
+                self.stream.flush()
+
+
+class BatchFlushMemoryHandler(MemoryHandler):
+    """MemoryHandler that flushes its target's file buffer after each batch.
+
+    Besides the capacity and flushLevel triggers, a daemon thread flushes the
+    batch every flush_interval seconds, so records logged while the service
+    is quiet still reach the file promptly.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        flushLevel: int = logging.ERROR,
+        target: logging.Handler | None = None,
+        flush_interval: float = 5.0,
+    ) -> None:
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self.flush_interval = flush_interval
+        self._stop_flushing = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, name="log-flush", daemon=True
+        )
+        self._flush_thread.start()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop_flushing.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop_flushing.set()
+        super().close()
+
+    def flush(self) -> None:
+        with self.lock:
+            super().flush()
+            if self.target is not None:
+                self.target.flush_buffer()
 
-# Ensure logs directory exists
-os.makedirs("logs", exist_ok=True)
 
 # Configure logging format
-formatter = logging.Formatter(
-    "%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+formatter = FastFormatter()
+
+# File output is batched: up to FILE_BATCH_CAPACITY records are held and
+# written together; ERROR and above flush the batch immediately, and a
+# partial batch is flushed every FILE_FLUSH_INTERVAL seconds
+FILE_BUFFER_SIZE = 64 * 1024  # 64KB
+FILE_BATCH_CAPACITY = 256
+FILE_FLUSH_INTERVAL = 5.0  # seconds
 
 # Create and configure file handler
-file_handler = RotatingFileHandler(
-    "logs/smart_home.log",
+file_handler = BufferedRotatingFileHandler(
+    LOG_DIR / "smart_home.log",
     maxBytes=10_000_000,  # 10MB
     backupCount=5,
 )
 file_handler.setFormatter(formatter)
+file_batch_handler = BatchFlushMemoryHandler(
+    capacity=FILE_BATCH_CAPACITY,
+    flushLevel=logging.ERROR,
+    target=file_handler,
+    flush_interval=FILE_FLUSH_INTERVAL,
+)
 
 # Create and configure console handler
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(formatter)
 
+# Hand records to a background listener so callers never block on file or
+# console I/O; the listener writes them out in order
+# SimpleQueue.put is a single C call with no Condition/lock round trip
+log_queue = queue.SimpleQueue()
+listener = QueueListener(
+    log_queue, file_batch_handler, console_handler, respect_handler_level=True
+)
+listener.start()
+atexit.register(listener.stop)
+
 # Create and configure logger
 logger = logging.getLogger("SmartHome")
-logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.addHandler(QueueHandler(log_queue))
+
+
+def get_context_logger(context: str) -> logging.LoggerAdapter:
+    """Return an adapter that tags every record with a fixed context.
+
+    The formatter writes the context as a "[context] " message prefix, so
+    callers don't repeat it in each message.
+
+    Args:
+        context: The context name, typically a sensor's DEVICE_NAME
+
+    Returns:
+        logging.LoggerAdapter: Adapter around the application logger
+    """
+    return logging.LoggerAdapter(logger, {"context": context})
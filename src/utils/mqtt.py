@@ -6,7 +6,7 @@ It manages the connection to the MQTT broker, handles message publishing
 and subscription, and processes various control messages.
 
 Connection Strategy:
-    - Uses TLS for secure communication (port 8883)
+    - Uses TLS 1.2+ for secure communication (port 8883)
     - Implements automatic reconnection
     - Maintains QoS levels for different message types
     - Handles connection failures gracefully
@@ -32,10 +32,15 @@ Message Types:
         - States: online/offline
         - Includes streaming parameters
 
+    The createdAt/created_at timestamps carried by control payloads are
+    ignored; handlers act on messages as they arrive and never parse them.
+
 Dependencies:
     - paho-mqtt: For MQTT protocol implementation
+    - orjson: For JSON payload parsing and serialization
     - dotenv: For configuration management
-    - database: For user and device state management
+    - database: For user lookups, via set_user_id_provider()
+    - light: Imported on first use by the light, device and automation handlers
 
 Environment Variables:
     - MQTT_BROKER_URL: MQTT broker address
@@ -43,25 +48,100 @@ Environment Variables:
     - MQTT_PASSWORD: Authentication password
 """
 
-import json
+import functools
 import os
+import queue
+import socket
+import ssl
+import threading
+import time
 
+import orjson
 import paho.mqtt.client as mqtt
-from dotenv import load_dotenv
 
-from src.utils.database import get_user_id_for_home
 from src.utils.logger import logger
 
-load_dotenv()
-
 # MQTT Configuration
 MQTT_BROKER_URL = os.getenv("MQTT_BROKER_URL")
 MQTT_USERNAME = os.getenv("MQTT_USERNAME")
 MQTT_PASSWORD = os.getenv("MQTT_PASSWORD")
 MQTT_PORT = 8883  # TLS port
+MQTT_RECONNECT_MIN_DELAY = 1  # seconds
+MQTT_RECONNECT_MAX_DELAY = 30  # seconds, paho's default cap is 120
+SOCKET_SEND_BUFFER_SIZE = 1 << 20  # 1MB, room for several camera frames
+
+# TLS 1.2 cipher preference: AES-GCM where the CPU has AES instructions
+# (e.g. Pi 5), ChaCha20-Poly1305 where AES would run in software (Pi 4)
+TLS12_CIPHERS_HW_AES = (
+    "ECDHE-ECDSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-GCM-SHA256:"
+    "ECDHE-ECDSA-CHACHA20-POLY1305:ECDHE-RSA-CHACHA20-POLY1305"
+)
+TLS12_CIPHERS_SW_AES = (
+    "ECDHE-ECDSA-CHACHA20-POLY1305:ECDHE-RSA-CHACHA20-POLY1305:"
+    "ECDHE-ECDSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-GCM-SHA256"
+)
+
+
+def _cpu_has_aes() -> bool:
+    """Return True if /proc/cpuinfo lists the aes CPU feature."""
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith(("Features", "flags")):
+                    return "aes" in line.split(":", 1)[1].split()
+    except OSError:
+        pass
+    return False
+
+
+# Built once: loading and parsing the system CA bundle is the costly part of
+# TLS setup. Brokers must offer TLS 1.2 or newer.
+_SSL_CONTEXT = ssl.create_default_context()
+_SSL_CONTEXT.minimum_version = ssl.TLSVersion.TLSv1_2
+_SSL_CONTEXT.set_ciphers(
+    TLS12_CIPHERS_HW_AES if _cpu_has_aes() else TLS12_CIPHERS_SW_AES
+)
+
+# Frame streaming backpressure: QoS 0 frames bypass paho's max_queued/
+# max_inflight limits, so published-but-unsent frames are tracked here
+MAX_INFLIGHT_FRAMES = 2
+
+_pending_frame_mids: set[int] = set()
+_frame_lock = threading.RLock()
+_frame_qos_warned = False
+
+# Connection state kept by on_connect/on_disconnect so publishers can check it
+# without calling into paho
+_connected = False
+
+# Outgoing string/JSON messages, published by a single background thread;
+# frames are latency-critical and bypass this queue
+PUBLISH_BATCH_SIZE = 32
+
+_publish_queue: queue.SimpleQueue = queue.SimpleQueue()
+_publish_thread: threading.Thread | None = None
+_publish_thread_lock = threading.Lock()
+
+# Malformed-message logging budget, per handler, so a misbehaving publisher
+# cannot flood the log from the paho callback thread
+LOG_LIMIT_PER_WINDOW = 5
+LOG_LIMIT_WINDOW_SECONDS = 60.0
+
+_log_windows: dict[str, tuple[float, int]] = {}
+
+# Unknown control message types already warned about, logged once each;
+# bounded so a publisher cycling through random types cannot grow it forever
+MAX_WARNED_TYPES = 64
 
-# Global client instance
-_mqtt_client_instance: mqtt.Client | None = None
+_warned_types: set[str] = set()
+
+# Registered by the entry point via set_user_id_provider()
+_user_id_provider = None
+
+# Resolved lazily by _camera_controls() and _light_controls()
+_start_camera_streaming = None
+_stop_camera_streaming = None
+_light_control_functions = None
 
 
 def on_connect(
@@ -81,22 +161,132 @@ def on_connect(
         properties: Properties for MQTT v5.0 (optional)
 
     Note:
-        - Automatically subscribes to 'control' topic on successful connection
+        - Subscribes to every topic in _TOPIC_HANDLERS on successful connection
         - Logs connection status and any subscription errors
         - Called by paho-mqtt client internally
     """
+    global _connected
     if rc == 0:
+        _connected = True
         logger.info("Connected to MQTT Broker!")
-        logger.info("Subscribing to 'control' topic with QoS 0...")
-        subscribe_result, mid = client.subscribe("control", qos=0)
+        topics = list(_TOPIC_HANDLERS)
+        logger.info("Subscribing to %s with QoS 0...", topics)
+        # One SUBSCRIBE packet covers every topic that has a handler
+        subscribe_result, mid = client.subscribe([(topic, 0) for topic in topics])
         if subscribe_result == mqtt.MQTT_ERR_SUCCESS:
-            logger.info("Successfully subscribed to 'control' topic.")
+            logger.info("Successfully subscribed to %s.", topics)
         else:
             logger.error(
-                f"Failed to subscribe to 'control' topic. Error: {mqtt.error_string(subscribe_result)}"
+                "Failed to subscribe to %s. Error: %s",
+                topics,
+                mqtt.error_string(subscribe_result),
             )
     else:
-        logger.error(f"Failed to connect to MQTT Broker, return code {rc}")
+        logger.error("Failed to connect to MQTT Broker, return code %s", rc)
+
+
+# Required payload keys per control message type; one set difference against
+# payload.keys() yields every missing field at once
+_LIGHT_REQUIRED_FIELDS = frozenset({"homeId", "type", "deviceId", "state"})
+_DEVICE_REQUIRED_FIELDS = frozenset({"home_id", "type", "device_id", "state"})
+_AUTOMATION_REQUIRED_FIELDS = frozenset({"home_id", "type", "mode_id", "active"})
+_CAMERA_REQUIRED_FIELDS = frozenset({"homeId", "type", "deviceId", "state"})
+
+# Map brightness percentages from MQTT to PWMLED intensity levels (0.0-1.0)
+_BRIGHTNESS_INTENSITY = {
+    0: 0.0,  # Off
+    10: 0.1,  # Low
+    100: 1.0,  # Full
+}
+
+# Accepted spellings of control states, matched without lowercasing the payload
+_ON_STATES = frozenset({"on", "On", "ON"})
+_OFF_STATES = frozenset({"off", "Off", "OFF"})
+_ONLINE_STATES = frozenset({"online", "Online", "ONLINE"})
+_OFFLINE_STATES = frozenset({"offline", "Offline", "OFFLINE"})
+
+
+def _camera_controls():
+    """Return the camera start/stop functions, importing them on first use.
+
+    src.sensors.camera imports this module, so it cannot be imported at the
+    top; the functions are cached in module globals after the first call.
+    """
+    global _start_camera_streaming, _stop_camera_streaming
+    if _start_camera_streaming is None:
+        from src.sensors.camera import start_camera_streaming, stop_camera_streaming
+
+        _start_camera_streaming = start_camera_streaming
+        _stop_camera_streaming = stop_camera_streaming
+    return _start_camera_streaming, _stop_camera_streaming
+
+
+def _light_controls():
+    """Return the light set/on/off functions, importing them on first use.
+
+    src.sensors.light imports the database layer, so importing it here only
+    when a light, device or automation message arrives keeps publish-only
+    processes free of it; the functions are cached after the first call.
+    """
+    global _light_control_functions
+    if _light_control_functions is None:
+        from src.sensors.light import set_light_intensity, turn_light_off, turn_light_on
+
+        _light_control_functions = (set_light_intensity, turn_light_on, turn_light_off)
+    return _light_control_functions
+
+
+def set_user_id_provider(provider) -> None:
+    """Register the function used to look up the user_id for a home.
+
+    Args:
+        provider: Callable taking a home_id and returning the user_id or None
+
+    Note:
+        - Keeps the database layer out of this module's imports
+        - Falls back to src.utils.database if nothing was registered
+    """
+    global _user_id_provider
+    _user_id_provider = provider
+
+
+def _get_user_id_for_home(home_id: str):
+    """Look up the user_id for a home through the registered provider."""
+    global _user_id_provider
+    if _user_id_provider is None:
+        from src.utils.database import get_user_id_for_home
+
+        _user_id_provider = get_user_id_for_home
+    return _user_id_provider(home_id)
+
+
+def _log_allowed(key: str) -> bool:
+    """Return True while the log budget for key in the current window lasts.
+
+    Args:
+        key: The log category, e.g. the control message type
+
+    Returns:
+        bool: Whether the caller should emit its log record
+
+    Note:
+        - Allows LOG_LIMIT_PER_WINDOW records per LOG_LIMIT_WINDOW_SECONDS
+        - Reports how many records were suppressed when a window closes
+        - Only called from the paho callback thread, so no lock is taken
+    """
+    now = time.monotonic()
+    window_start, count = _log_windows.get(key, (now, 0))
+    if now - window_start >= LOG_LIMIT_WINDOW_SECONDS:
+        if count > LOG_LIMIT_PER_WINDOW:
+            logger.warning(
+                "[MQTT] Suppressed %d '%s' log message(s)",
+                count - LOG_LIMIT_PER_WINDOW,
+                key,
+            )
+        window_start, count = now, 0
+    count += 1
+    _log_windows[key] = (window_start, count)
+    return count <= LOG_LIMIT_PER_WINDOW
 
 
 def _handle_light_control_message(payload: dict) -> None:
@@ -135,61 +325,67 @@ def _handle_light_control_message(payload: dict) -> None:
         - Maps brightness percentages to PWM values
         - Handles errors gracefully
     """
-    from src.sensors.light import set_light_intensity, turn_light_off, turn_light_on
-
     try:
-        logger.info(f"[MQTT] Received light control payload: {payload}")
+        logger.debug("[MQTT] Received light control payload: %s", payload)
 
         # Validate required fields
-        required_fields = ["homeId", "type", "deviceId", "state"]
-        if not all(field in payload for field in required_fields):
-            logger.error(
-                f"[MQTT] Missing required fields in light control payload: {payload}"
-            )
+        missing_fields = _LIGHT_REQUIRED_FIELDS - payload.keys()
+        if missing_fields:
+            if _log_allowed("light"):
+                logger.error(
+                    "[MQTT] Missing required field(s) %s in light control payload",
+                    sorted(missing_fields),
+                )
             return
 
+        message_type = payload["type"]
+        home_id = payload["homeId"]
+        state = payload["state"]
+        brightness = payload.get("brightness")
+
         # Only process light type messages
-        if payload["type"] != "light":
-            logger.error(
-                f"[MQTT] Received non-light type in light control handler: {payload['type']}"
-            )
+        if message_type != "light":
+            if _log_allowed("light"):
+                logger.error(
+                    "[MQTT] Received non-light type in light control handler: %s",
+                    message_type,
+                )
             return
 
-        home_id = payload["homeId"]
-        state = payload["state"].lower()
+        set_light_intensity, turn_light_on, turn_light_off = _light_controls()
 
         # Handle brightness control
-        if "brightness" in payload:
-            brightness = int(payload["brightness"])
-            # Map brightness percentages from MQTT to PWMLED intensity levels (0.0-1.0)
-            intensity_map = {
-                0: 0.0,  # Off
-                10: 0.1,  # Low
-                100: 1.0,  # Full
-            }
-            if brightness in intensity_map:
+        if brightness is not None:
+            brightness = int(brightness)
+            intensity = _BRIGHTNESS_INTENSITY.get(brightness)
+            if intensity is not None:
                 logger.info(
-                    f"[MQTT] Setting light brightness to {brightness}% (Intensity: {intensity_map[brightness]})"
+                    "[MQTT] Setting light brightness to %s%% (Intensity: %s)",
+                    brightness,
+                    intensity,
                 )
-                set_light_intensity(home_id, intensity_map[brightness])
-            else:
+                set_light_intensity(home_id, intensity)
+            elif _log_allowed("light"):
                 logger.error(
-                    f"[MQTT] Invalid brightness value: {brightness}. Must be one of: {list(intensity_map.keys())}"
+                    "[MQTT] Invalid brightness value: %s. Must be one of: %s",
+                    brightness,
+                    list(_BRIGHTNESS_INTENSITY),
                 )
             return
 
         # Handle on/off control
-        if state == "on":
+        if state in _ON_STATES:
             logger.info("[MQTT] Turning light on")
             turn_light_on(home_id)
-        elif state == "off":
+        elif state in _OFF_STATES:
             logger.info("[MQTT] Turning light off")
             turn_light_off(home_id)
-        else:
-            logger.error(f"[MQTT] Invalid light state: {state}. Must be 'on' or 'off'")
+        elif _log_allowed("light"):
+            logger.error("[MQTT] Invalid light state: %s. Must be 'on' or 'off'", state)
 
     except Exception as e:
-        logger.error(f"[MQTT] Error handling light control message: {e}")
+        if _log_allowed("light"):
+            logger.error("[MQTT] Error handling light control message: %s", e)
 
 
 def _handle_device_control_message(payload: dict) -> None:
@@ -216,17 +412,16 @@ def _handle_device_control_message(payload: dict) -> None:
         - Validates required fields
         - Extensible for other device types
     """
-    from src.sensors.light import turn_light_off, turn_light_on
-
     try:
         # Validate required fields
-        required_fields = ["home_id", "type", "device_id", "state"]
-        for field in required_fields:
-            if field not in payload:
+        missing_fields = _DEVICE_REQUIRED_FIELDS - payload.keys()
+        if missing_fields:
+            if _log_allowed("device"):
                 logger.error(
-                    f"[MQTT] Missing required field '{field}' in device control payload"
+                    "[MQTT] Missing required field(s) %s in device control payload",
+                    sorted(missing_fields),
                 )
-                return
+            return
 
         home_id = payload["home_id"]
         device_id = payload["device_id"]
@@ -235,13 +430,15 @@ def _handle_device_control_message(payload: dict) -> None:
 
         # Only handle light device for now
         if device_id == "light_01":
+            _, turn_light_on, turn_light_off = _light_controls()
             if state == "on":
                 turn_light_on(home_id, brightness)
             elif state == "off":
                 turn_light_off(home_id)
 
     except Exception as e:
-        logger.error(f"[MQTT] Error handling device control message: {e}")
+        if _log_allowed("device"):
+            logger.error("[MQTT] Error handling device control message: %s", e)
 
 
 def _handle_automation_control_message(payload: dict) -> None:
@@ -267,40 +464,44 @@ def _handle_automation_control_message(payload: dict) -> None:
         - Validates required fields
         - Handles user association for alerts
     """
-    from src.sensors.light import set_light_intensity, turn_light_off
-
     try:
         # Validate required fields
-        required_fields = ["home_id", "type", "mode_id", "active"]
-        for field in required_fields:
-            if field not in payload:
+        missing_fields = _AUTOMATION_REQUIRED_FIELDS - payload.keys()
+        if missing_fields:
+            if _log_allowed("automation"):
                 logger.error(
-                    f"[MQTT] Missing required field '{field}' in automation control payload"
+                    "[MQTT] Missing required field(s) %s in automation control payload",
+                    sorted(missing_fields),
                 )
-                return
+            return
 
         home_id = payload["home_id"]
         mode_id = payload["mode_id"]
         is_active = payload["active"]
 
         # Get user_id for security alerts
-        user_id = get_user_id_for_home(home_id)
+        user_id = _get_user_id_for_home(home_id)
         if not user_id:
             logger.warning(
-                f"[MQTT] Could not fetch user_id for HOME_ID '{home_id}'. Alerts may not be sent."
+                "[MQTT] Could not fetch user_id for HOME_ID '%s'. Alerts may not be sent.",
+                home_id,
             )
 
         # Only handle movie mode for now
         if mode_id == "movie":
             logger.info(
-                f"[MQTT] Movie mode {'activated' if is_active else 'deactivated'} for home {home_id}"
+                "[MQTT] Movie mode %s for home %s",
+                "activated" if is_active else "deactivated",
+                home_id,
             )
             if is_active:
+                set_light_intensity, _, _ = _light_controls()
                 set_light_intensity(home_id, 0.2)
                 logger.info("[MQTT] Turned on lights for movie mode to 20%")
 
     except Exception as e:
-        logger.error(f"[MQTT] Error handling automation control message: {e}")
+        if _log_allowed("automation"):
+            logger.error("[MQTT] Error handling automation control message: %s", e)
 
 
 def _handle_camera_control_message(payload: dict) -> None:
@@ -325,48 +526,126 @@ def _handle_camera_control_message(payload: dict) -> None:
         - Manages streaming start/stop
         - Validates message format
     """
-    from src.sensors.camera import start_camera_streaming, stop_camera_streaming
+    start_camera_streaming, stop_camera_streaming = _camera_controls()
 
     try:
-        logger.info(f"[MQTT] Received camera control payload: {payload}")
+        logger.debug("[MQTT] Received camera control payload: %s", payload)
 
         # Validate required fields
-        required_fields = ["homeId", "type", "deviceId", "state"]
-        if not all(field in payload for field in required_fields):
-            logger.error(
-                f"[MQTT] Missing required fields in camera control payload: {payload}"
-            )
+        missing_fields = _CAMERA_REQUIRED_FIELDS - payload.keys()
+        if missing_fields:
+            if _log_allowed("camera"):
+                logger.error(
+                    "[MQTT] Missing required field(s) %s in camera control payload",
+                    sorted(missing_fields),
+                )
             return
 
+        message_type = payload["type"]
+        device_id = payload["deviceId"]
+        home_id = payload["homeId"]
+        state = payload["state"]
+
         # Only process camera type messages for the specific camera_01
-        if payload["type"] != "camera" or payload["deviceId"] != "camera_01":
-            logger.warning(
-                f"[MQTT] Received non-camera type or wrong deviceId in camera control handler: {payload}"
-            )
+        if message_type != "camera" or device_id != "camera_01":
+            if _log_allowed("camera"):
+                logger.warning(
+                    "[MQTT] Received non-camera type or wrong deviceId in camera control handler: %s/%s",
+                    message_type,
+                    device_id,
+                )
             return
 
-        home_id = payload["homeId"]
-        state = payload["state"].lower()
-
-        if state == "online":
-            logger.info(f"[MQTT] Starting camera streaming for home_id: {home_id}")
+        if state in _ONLINE_STATES:
+            logger.info("[MQTT] Starting camera streaming for home_id: %s", home_id)
             start_camera_streaming(home_id)
-        elif state == "offline":
-            logger.info(f"[MQTT] Stopping camera streaming for home_id: {home_id}")
+        elif state in _OFFLINE_STATES:
+            logger.info("[MQTT] Stopping camera streaming for home_id: %s", home_id)
             stop_camera_streaming(home_id)
-        else:
+        elif _log_allowed("camera"):
             logger.error(
-                f"[MQTT] Invalid camera state: {state}. Must be 'online' or 'offline'"
+                "[MQTT] Invalid camera state: %s. Must be 'online' or 'offline'",
+                state,
+            )
+
+    except Exception as e:
+        if _log_allowed("camera"):
+            logger.error("[MQTT] Error handling camera control message: %s", e)
+
+
+# Control message handlers keyed by the payload's "type" field
+_CONTROL_HANDLERS = {
+    "light": _handle_light_control_message,
+    "device": _handle_device_control_message,
+    "automation": _handle_automation_control_message,
+    "camera": _handle_camera_control_message,
+}
+
+
+def _on_control_message(payload: bytes) -> None:
+    """Parse a message from the 'control' topic and route it by its type.
+
+    Args:
+        payload: The raw JSON payload bytes
+    """
+    logger.debug("Received control message, %d bytes", len(payload))
+    # Every routable message names its type; reject the rest with a byte scan
+    # instead of a full JSON parse
+    if b'"type"' not in payload:
+        if _log_allowed("control"):
+            logger.warning(
+                "Ignoring message on 'control' topic without a type field (%d bytes)",
+                len(payload),
             )
+        return
 
+    try:
+        # orjson parses the UTF-8 bytes directly; invalid UTF-8 raises
+        # JSONDecodeError too, so no separate decode step is needed
+        parsed_payload = orjson.loads(payload)
+        message_type = parsed_payload.get("type")
+        if not isinstance(message_type, str):
+            # Unhashable types (lists, objects) could not be looked up below
+            message_type = repr(message_type)
+
+        handler = _CONTROL_HANDLERS.get(message_type)
+        if handler is not None:
+            handler(parsed_payload)
+        elif message_type in _warned_types:
+            logger.debug("Ignoring control message of unknown type '%s'", message_type)
+        else:
+            if len(_warned_types) < MAX_WARNED_TYPES:
+                _warned_types.add(message_type)
+            if _log_allowed("control"):
+                logger.warning(
+                    "Received message on 'control' topic with unknown type: '%s'",
+                    message_type,
+                )
+    except orjson.JSONDecodeError:
+        if _log_allowed("control"):
+            logger.error(
+                "Error decoding JSON from message on 'control' topic (%d bytes)",
+                len(payload),
+            )
+        logger.debug("Undecodable control payload: %r", payload)
     except Exception as e:
-        logger.error(f"[MQTT] Error handling camera control message: {e}")
+        if _log_allowed("control"):
+            logger.error("Error processing message from 'control' topic: %s", e)
+
+
+# Inbound message handlers keyed by exact topic; on_connect subscribes to each.
+# Exact topics keep dispatch to one dict lookup; a wildcard subscription would
+# need paho's MQTTMatcher here instead
+_TOPIC_HANDLERS = {
+    "control": _on_control_message,
+}
 
 
 def on_message(client: mqtt.Client, userdata: any, msg: mqtt.MQTTMessage) -> None:
     """Callback for when a PUBLISH message is received from the server.
 
-    Routes incoming messages to appropriate handlers based on payload type.
+    Routes incoming messages to appropriate handlers based on topic and
+    payload type.
 
     Args:
         client: The client instance for this callback
@@ -374,44 +653,75 @@ def on_message(client: mqtt.Client, userdata: any, msg: mqtt.MQTTMessage) -> Non
         msg: An instance of MQTTMessage containing topic and payload
 
     Note:
-        - Decodes JSON payloads
+        - Picks the topic handler with a single dict lookup
+        - Parses JSON payloads straight from bytes with orjson
         - Routes to specific handlers based on type field
         - Handles malformed messages gracefully
     """
-    logger.info(f"Received raw message on topic {msg.topic}: {msg.payload[:200]}...")
-    try:
-        payload_str = msg.payload.decode("utf-8")
-    except UnicodeDecodeError:
-        logger.error(
-            f"Error decoding message payload on topic {msg.topic} as UTF-8. Payload (hex): {msg.payload.hex()}"
-        )
-        return
+    handler = _TOPIC_HANDLERS.get(msg.topic)
+    if handler is not None:
+        handler(msg.payload)
 
-    if msg.topic == "control":
-        try:
-            parsed_payload = json.loads(payload_str)
-            message_type = parsed_payload.get("type")
-
-            if message_type == "light":
-                _handle_light_control_message(parsed_payload)
-            elif message_type == "device":
-                _handle_device_control_message(parsed_payload)
-            elif message_type == "automation":
-                _handle_automation_control_message(parsed_payload)
-            elif message_type == "camera":
-                _handle_camera_control_message(parsed_payload)
-            else:
-                logger.warning(
-                    f"Received message on 'control' topic with unknown type: '{message_type}'. Payload: {parsed_payload}"
-                )
-        except json.JSONDecodeError:
-            logger.error(
-                f"Error decoding JSON from message on 'control' topic. Payload: {payload_str}"
-            )
-        except Exception as e:
-            logger.error(
-                f"Error processing message from 'control' topic: {e}. Payload: {payload_str}"
-            )
+
+def on_publish(
+    client: mqtt.Client,
+    userdata: any,
+    mid: int,
+    reason_code: mqtt.ReasonCode,
+    properties: mqtt.Properties | None = None,
+) -> None:
+    """Callback for when a message has been handed to the network.
+
+    Args:
+        client: The client instance for this callback
+        userdata: The private user data as set in Client() or userdata_set()
+        mid: Message ID of the published message
+        reason_code: Publish result reason code
+        properties: Properties for MQTT v5.0 (optional)
+
+    Note:
+        - For QoS 0 this fires once the packet has been written to the socket
+        - Releases the slot held by an in-flight camera frame
+    """
+    with _frame_lock:
+        _pending_frame_mids.discard(mid)
+
+
+def _clear_pending_frames() -> None:
+    """Forget in-flight frames; their packets are dropped with the connection."""
+    with _frame_lock:
+        _pending_frame_mids.clear()
+
+
+def is_frame_backlogged() -> bool:
+    """Return True when MAX_INFLIGHT_FRAMES frames are still waiting to be sent.
+
+    Lets producers skip encoding a frame that publish_frame would drop.
+    """
+    with _frame_lock:
+        return len(_pending_frame_mids) >= MAX_INFLIGHT_FRAMES
+
+
+def on_socket_open(client: mqtt.Client, userdata: any, sock) -> None:
+    """Callback for when the broker socket has been opened and wrapped in TLS.
+
+    Args:
+        client: The client instance for this callback
+        userdata: The private user data as set in Client() or userdata_set()
+        sock: The connected (TLS) socket
+
+    Note:
+        - Disables Nagle's algorithm so small control/JSON messages are sent
+          immediately instead of waiting to be coalesced
+        - Enlarges the send buffer so a whole camera frame fits without
+          blocking the next write (the kernel caps it at net.core.wmem_max)
+        - Runs again on every reconnect
+    """
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SEND_BUFFER_SIZE)
+    except OSError as e:
+        logger.warning("Could not tune MQTT socket options: %s", e)
 
 
 def on_disconnect(
@@ -434,17 +744,22 @@ def on_disconnect(
         - Logs unexpected disconnections
         - Client will automatically attempt to reconnect
     """
-    logger.info(f"Disconnected from MQTT Broker with result code {rc}")
+    global _connected
+    _connected = False
+    logger.info("Disconnected from MQTT Broker with result code %s", rc)
+    _clear_pending_frames()
     if rc != 0:
         logger.warning(
             "Unexpected MQTT disconnection. Client will attempt to reconnect automatically if loop is running."
         )
 
 
-def get_mqtt_client() -> mqtt.Client:
+@functools.cache
+def _make_mqtt_client() -> mqtt.Client:
     """Get or create an MQTT client instance.
 
-    Creates a new MQTT client if none exists, or returns the existing one.
+    Creates a new MQTT client on the first call and returns the same one
+    afterwards.
     Handles all client setup including:
     - TLS configuration
     - Authentication
@@ -458,57 +773,133 @@ def get_mqtt_client() -> mqtt.Client:
         RuntimeError: If connection fails or configuration is invalid
 
     Note:
-        - Uses singleton pattern
+        - Singleton via functools.cache; a failed connection raises and is
+          not cached, so the next call retries
         - Configures TLS for secure communication
         - Sets up automatic reconnection
     """
-    global _mqtt_client_instance
+    if not all([MQTT_BROKER_URL, MQTT_USERNAME, MQTT_PASSWORD]):
+        logger.error(
+            "Critical: MQTT credentials (URL, USERNAME, PASSWORD) not found. Check .env file."
+        )
+        raise ValueError("Missing MQTT configuration in environment variables.")
 
-    if _mqtt_client_instance is None:
-        if not all([MQTT_BROKER_URL, MQTT_USERNAME, MQTT_PASSWORD]):
-            logger.error(
-                "Critical: MQTT credentials (URL, USERNAME, PASSWORD) not found. Check .env file."
-            )
-            raise ValueError("Missing MQTT configuration in environment variables.")
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
 
-        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.on_disconnect = on_disconnect
+    client.on_publish = on_publish
+    client.on_socket_open = on_socket_open
 
-        client.on_connect = on_connect
-        client.on_message = on_message
-        client.on_disconnect = on_disconnect
+    client.username_pw_set(MQTT_USERNAME, MQTT_PASSWORD)
 
-        client.username_pw_set(MQTT_USERNAME, MQTT_PASSWORD)
+    client.tls_set_context(_SSL_CONTEXT)
+    # max_inflight/max_queued only bound QoS > 0 messages, so they would not
+    # change anything for the QoS 0 traffic published here
+    client.reconnect_delay_set(
+        min_delay=MQTT_RECONNECT_MIN_DELAY, max_delay=MQTT_RECONNECT_MAX_DELAY
+    )
 
-        client.tls_set()
+    try:
+        logger.info(
+            "Initializing and connecting MQTT client to %s:%s...",
+            MQTT_BROKER_URL,
+            MQTT_PORT,
+        )
+        client.connect(MQTT_BROKER_URL, MQTT_PORT, 60)
+        # paho's network thread only selects over the broker socket and its
+        # wake-up pipe, so an epoll-driven loop would save nothing here and
+        # would have to reimplement loop_start's automatic reconnects
+        client.loop_start()
+        logger.info("MQTT client connected and loop started.")
+    except ConnectionRefusedError as e:
+        logger.error(
+            "Connection to %s:%s refused. Check broker, port, firewall, TLS.",
+            MQTT_BROKER_URL,
+            MQTT_PORT,
+        )
+        raise e
+    except mqtt.WebsocketConnectionError as e:
+        logger.error("MQTT WebSocket connection error: %s", e)
+        raise e
+    except TimeoutError as e:
+        logger.error(
+            "Timeout during MQTT connection to %s:%s.", MQTT_BROKER_URL, MQTT_PORT
+        )
+        raise e
+    except Exception as e:
+        logger.error(
+            "An unexpected error occurred during MQTT client initialization: %s", e
+        )
+        raise e
+
+    return client
+
+
+# Callers keep using get_mqtt_client(); the name is bound to the cached factory
+get_mqtt_client = _make_mqtt_client
 
+
+def disconnect_mqtt_client() -> None:
+    """Stop the network loop and disconnect the shared client, if created.
+
+    Note:
+        - Does nothing if get_mqtt_client() never succeeded
+        - Clears the cache so a later get_mqtt_client() reconnects
+    """
+    if not _make_mqtt_client.cache_info().currsize:
+        return
+    client = _make_mqtt_client()
+    _make_mqtt_client.cache_clear()
+    if client.is_connected():
+        logger.info("Disconnecting MQTT client...")
+        client.loop_stop()
+        client.disconnect()
+        logger.info("MQTT client disconnected.")
+
+
+def _publish_loop() -> None:
+    """Publish queued messages, draining up to PUBLISH_BATCH_SIZE per wake-up."""
+    while True:
+        batch = [_publish_queue.get()]
         try:
-            logger.info(
-                f"Initializing and connecting MQTT client to {MQTT_BROKER_URL}:{MQTT_PORT}..."
-            )
-            client.connect(MQTT_BROKER_URL, MQTT_PORT, 60)
-            client.loop_start()
-            _mqtt_client_instance = client
-            logger.info("MQTT client connected and loop started.")
-        except ConnectionRefusedError as e:
-            logger.error(
-                f"Connection to {MQTT_BROKER_URL}:{MQTT_PORT} refused. Check broker, port, firewall, TLS."
-            )
-            raise e
-        except mqtt.WebsocketConnectionError as e:
-            logger.error(f"MQTT WebSocket connection error: {e}")
-            raise e
-        except TimeoutError as e:
-            logger.error(
-                f"Timeout during MQTT connection to {MQTT_BROKER_URL}:{MQTT_PORT}."
-            )
-            raise e
+            while len(batch) < PUBLISH_BATCH_SIZE:
+                batch.append(_publish_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        try:
+            client = get_mqtt_client()
         except Exception as e:
-            logger.error(
-                f"An unexpected error occurred during MQTT client initialization: {e}"
-            )
-            raise e
+            logger.error("Dropping %s queued MQTT message(s): %s", len(batch), e)
+            continue
 
-    return _mqtt_client_instance
+        for topic, payload, qos, retain, kind in batch:
+            msg_info = client.publish(topic, payload, qos=qos, retain=retain)
+            if msg_info.rc != mqtt.MQTT_ERR_SUCCESS:
+                logger.error(
+                    "Failed to queue %s for topic %s. Error: %s (Code: %s)",
+                    kind,
+                    topic,
+                    mqtt.error_string(msg_info.rc),
+                    msg_info.rc,
+                )
+
+
+def _enqueue_publish(
+    topic: str, payload: str | bytes, qos: int, retain: bool, kind: str
+) -> None:
+    """Queue a message for the publisher thread, starting it if needed."""
+    global _publish_thread
+    if _publish_thread is None or not _publish_thread.is_alive():
+        with _publish_thread_lock:
+            if _publish_thread is None or not _publish_thread.is_alive():
+                _publish_thread = threading.Thread(
+                    target=_publish_loop, name="mqtt-publish", daemon=True
+                )
+                _publish_thread.start()
+    _publish_queue.put((topic, payload, qos, retain, kind))
 
 
 def publish_string(
@@ -522,22 +913,19 @@ def publish_string(
         qos: Quality of Service level (0-2)
         retain: Whether to retain the message
 
-    Raises:
-        RuntimeError: If client is not connected
+    Note:
+        - Handed to the publisher thread; returns without waiting for paho
+        - If the client is not connected, the message is dropped and a
+          warning is logged
     """
-    client = get_mqtt_client()
-    if not client.is_connected():
+    get_mqtt_client()  # connects on first use
+    if not _connected:
         logger.warning(
             "MQTT client is not connected. Cannot publish string. Reconnection is usually automatic."
         )
         return
 
-    msg_info = client.publish(topic, payload, qos=qos, retain=retain)
-
-    if msg_info.rc != mqtt.MQTT_ERR_SUCCESS:
-        logger.error(
-            f"Failed to queue string message for topic {topic}. Error: {mqtt.error_string(msg_info.rc)} (Code: {msg_info.rc})"
-        )
+    _enqueue_publish(topic, payload, qos, retain, "string message")
 
 
 def subscribe_to_topic(client: mqtt.Client, topic: str, qos: int = 0) -> None:
@@ -560,35 +948,64 @@ def subscribe_to_topic(client: mqtt.Client, topic: str, qos: int = 0) -> None:
     result, mid = client.subscribe(topic, qos)
     if result != mqtt.MQTT_ERR_SUCCESS:
         logger.error(
-            f"Failed to subscribe to '{topic}'. Error: {mqtt.error_string(result)} (Code: {result})"
+            "Failed to subscribe to '%s'. Error: %s (Code: %s)",
+            topic,
+            mqtt.error_string(result),
+            result,
         )
         return
 
 
 def publish_frame(
-    topic: str, image_bytes: bytes, qos: int = 0, retain: bool = False
+    topic: str, image_bytes: bytes | bytearray, qos: int = 0, retain: bool = False
 ) -> None:
     """Publish a video frame as bytes to an MQTT topic.
 
     Args:
         topic: The topic to publish to
-        image_bytes: The frame data as bytes
-        qos: Quality of Service level (0-2)
-        retain: Whether to retain the message
+        image_bytes: The frame data; bytearray is sent without a copy
+            (paho rejects memoryview payloads)
+        qos: Quality of Service level; anything above 0 is downgraded to 0
+        retain: Whether to retain the message; always forced to False
 
     Note:
         - Optimized for video streaming
         - Does not encode/decode frames
+        - Frames are fire-and-forget: a QoS 1 PUBACK round trip adds 5-20 ms
+          per frame over TLS, and retaining a stale frame helps no one
+        - Drops the frame while MAX_INFLIGHT_FRAMES earlier frames are unsent,
+          keeping the outgoing queue and stream latency bounded
     """
+    global _frame_qos_warned
+    if qos or retain:
+        if not _frame_qos_warned:
+            _frame_qos_warned = True
+            logger.warning(
+                "Frame streams are published with QoS 0 and retain=False "
+                "(requested qos=%s, retain=%s)",
+                qos,
+                retain,
+            )
+        qos, retain = 0, False
+
     client = get_mqtt_client()
-    if not client.is_connected():
+    if not _connected:
         logger.warning("MQTT client is not connected. Cannot publish frame.")
         return
 
-    msg_info = client.publish(topic, image_bytes, qos=qos, retain=retain)
+    with _frame_lock:
+        if len(_pending_frame_mids) >= MAX_INFLIGHT_FRAMES:
+            logger.debug("Frame dropped for topic %s: publish backlog full", topic)
+            return
+        msg_info = client.publish(topic, image_bytes, qos=qos, retain=retain)
+        if msg_info.rc == mqtt.MQTT_ERR_SUCCESS and not msg_info.is_published():
+            _pending_frame_mids.add(msg_info.mid)
+
     if msg_info.rc != mqtt.MQTT_ERR_SUCCESS:
         logger.error(
-            f"Failed to queue frame for topic {topic}. Error: {mqtt.error_string(msg_info.rc)}"
+            "Failed to queue frame for topic %s. Error: %s",
+            topic,
+            mqtt.error_string(msg_info.rc),
         )
 
 
@@ -603,26 +1020,26 @@ def publish_json(
         qos: Quality of Service level (0-2)
         retain: Whether to retain the message
 
-    Raises:
-        RuntimeError: If client is not connected
-        JSONEncodeError: If dictionary cannot be serialized
+    Note:
+        - Handed to the publisher thread; returns without waiting for paho
+        - If the client is not connected, the message is dropped and a
+          warning is logged
+        - If the dictionary cannot be serialized, the message is dropped and
+          an error is logged
     """
-    client = get_mqtt_client()
+    get_mqtt_client()  # connects on first use
     try:
-        json_payload = json.dumps(message_dict)
-    except TypeError as e:
-        logger.error(f"Error serializing message_dict to JSON for topic {topic}: {e}")
+        json_payload = orjson.dumps(message_dict)
+    except TypeError as e:  # orjson.JSONEncodeError is a TypeError
+        logger.error(
+            "Error serializing message_dict to JSON for topic %s: %s", topic, e
+        )
         return
 
-    if not client.is_connected():
+    if not _connected:
         logger.warning(
             "MQTT client is not connected. Cannot publish JSON. Reconnection is usually automatic."
         )
         return
 
-    msg_info = client.publish(topic, json_payload, qos=qos, retain=retain)
-
-    if msg_info.rc != mqtt.MQTT_ERR_SUCCESS:
-        logger.error(
-            f"Failed to queue JSON message for topic {topic}. Error: {mqtt.error_string(msg_info.rc)} (Code: {msg_info.rc})"
-        )
+    _enqueue_publish(topic, json_payload, qos, retain, "JSON message")
@@ -0,0 +1,62 @@
+"""
+Thread Helpers Module
+
+This module provides a helper for starting the long-running sensor
+monitoring threads with a small, bounded stack.
+
+Memory Usage:
+    - Default thread stack on Raspberry Pi OS: 8 MB per thread
+    - Sensor monitoring threads: 256 KB per thread
+    - threading.stack_size() is process-wide, so the previous value is
+      restored as soon as the thread has been created
+
+Usage:
+    from src.utils.threads import start_monitoring_thread
+
+    thread = start_monitoring_thread(_monitoring_loop, home_id, user_id)
+"""
+
+import threading
+from typing import Any, Callable
+
+from src.utils.logger import logger
+
+MONITORING_THREAD_STACK_SIZE = 256 * 1024  # 256 KB
+
+_stack_size_lock = threading.Lock()
+
+
+def start_monitoring_thread(
+    target: Callable[..., Any], *args: Any, **kwargs: Any
+) -> threading.Thread:
+    """Start a daemon monitoring thread with a reduced stack size.
+
+    Args:
+        target: The callable run by the thread
+        *args: Positional arguments passed to target
+        **kwargs: Keyword arguments passed to target
+
+    Returns:
+        threading.Thread: The started daemon thread
+
+    Note:
+        - Falls back to the default stack size if the platform rejects it
+        - Thread-safe; stack size changes are serialized
+    """
+    with _stack_size_lock:
+        try:
+            previous_stack_size = threading.stack_size(MONITORING_THREAD_STACK_SIZE)
+        except (ValueError, RuntimeError) as e:
+            logger.warning("Unable to set monitoring thread stack size: %s", e)
+            previous_stack_size = None
+
+        try:
+            thread = threading.Thread(
+                target=target, args=args, kwargs=kwargs, daemon=True
+            )
+            thread.start()
+        finally:
+            if previous_stack_size is not None:
+                threading.stack_size(previous_stack_size)
+
+    return thread
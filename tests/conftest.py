@@ -1,6 +1,8 @@
+import os
 import sys
 import threading
 import time
+from types import SimpleNamespace
 from typing import Dict
 from unittest.mock import MagicMock
 
@@ -10,13 +12,18 @@ import pytest
 # Mock modules before importing camera
 def pytest_configure():
     """Configure test environment before running tests."""
+    # Don't open a Supabase connection when src.utils.database is imported
+    os.environ.setdefault("SMART_HOME_WARMUP", "0")
+
     # Mock picamera2 module
     picamera2_mock = MagicMock()
     picamera2_mock.Picamera2 = MagicMock()
     picamera2_mock.encoders = MagicMock()
     picamera2_mock.encoders.MP4Encoder = MagicMock()
+    picamera2_mock.outputs = MagicMock()
     sys.modules["picamera2"] = picamera2_mock
     sys.modules["picamera2.encoders"] = picamera2_mock.encoders
+    sys.modules["picamera2.outputs"] = picamera2_mock.outputs
 
 
 class TimeController:
@@ -125,3 +132,88 @@ def cleanup_camera():
     # Ensure thread is cleaned up
     if _camera_thread and _camera_thread.is_alive():
         _camera_thread.join(timeout=1.0)
+
+
+# Session-wide mocks for the light and lux modules. Patching once per session
+# and resetting per test avoids re-patching every attribute for each test.
+LIGHT_DB_FUNCTIONS = (
+    "get_device_by_id",
+    "get_home_mode",
+    "get_user_id_for_home",
+    "insert_alert",
+    "insert_device",
+    "update_device_state",
+    "insert_event",
+)
+LUX_DB_FUNCTIONS = (
+    "get_device_with_latest_state",
+    "insert_device",
+    "update_device_state",
+    "transition_device_state",
+)
+
+
+@pytest.fixture(scope="session")
+def light_session_mocks():
+    """Patch the light module's database functions for the whole session."""
+    from src.sensors import light
+
+    mocks = {name: MagicMock(name=name) for name in LIGHT_DB_FUNCTIONS}
+    with pytest.MonkeyPatch.context() as mp:
+        for name, mock in mocks.items():
+            mp.setattr(light, name, mock)
+        yield mocks
+
+
+@pytest.fixture(scope="session")
+def lux_session_mocks():
+    """Patch the lux module's database functions, logger and sleep for the session."""
+    from src.sensors import lux
+
+    mocks = {name: MagicMock(name=name) for name in LUX_DB_FUNCTIONS}
+    mocks["logger"] = MagicMock(name="lux_logger")
+    mocks["sleep"] = MagicMock(name="lux_time_sleep")
+    with pytest.MonkeyPatch.context() as mp:
+        for name in LUX_DB_FUNCTIONS + ("logger",):
+            mp.setattr(lux, name, mocks[name])
+        # Replace lux's time module rather than time.sleep itself, which
+        # would stop every other module's sleeps for the rest of the session
+        mp.setattr(lux, "time", SimpleNamespace(sleep=mocks["sleep"]))
+        yield mocks
+
+
+def _reset_mocks(mocks):
+    for mock in mocks:
+        mock.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture
+def mock_db_functions_light(light_session_mocks):
+    """Mock database utility functions for light module."""
+    _reset_mocks(light_session_mocks.values())
+    light_session_mocks["get_device_by_id"].return_value = None  # Device not found
+    light_session_mocks["get_home_mode"].return_value = "home"
+    return light_session_mocks
+
+
+@pytest.fixture
+def mock_db_lux_functions(lux_session_mocks):
+    """Mock database utility functions for lux module."""
+    db_mocks = {name: lux_session_mocks[name] for name in LUX_DB_FUNCTIONS}
+    _reset_mocks(db_mocks.values())
+    db_mocks["get_device_with_latest_state"].return_value = None
+    return db_mocks
+
+
+@pytest.fixture
+def mock_lux_logger(lux_session_mocks):
+    """Mock the lux module's logger."""
+    _reset_mocks([lux_session_mocks["logger"]])
+    return lux_session_mocks["logger"]
+
+
+@pytest.fixture
+def mock_lux_time_sleep(lux_session_mocks):
+    """Mock time.sleep as seen by the lux module."""
+    _reset_mocks([lux_session_mocks["sleep"]])
+    return lux_session_mocks["sleep"]
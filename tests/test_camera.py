@@ -1,39 +1,18 @@
 """Test suite for the camera module."""
 
-import json
 import os
-import sys
-import time
+import threading
 from datetime import datetime, timezone
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, create_autospec
 
 import numpy as np
+import orjson
 import paho.mqtt.client as mqtt
 import pytest
 
-# Mock picamera2 module and its submodules before importing camera
-picamera2_mock = MagicMock()
-picamera2_mock.Picamera2 = MagicMock()
-picamera2_mock.encoders = MagicMock()
-picamera2_mock.encoders.MP4Encoder = MagicMock()
-
-# Mock MQTT client before importing camera
-mqtt_client_mock = MagicMock()
-mqtt_utils_mock = MagicMock()
-mqtt_utils_mock.get_mqtt_client = MagicMock(return_value=mqtt_client_mock)
-mqtt_utils_mock.publish_message = MagicMock()
-
-# Mock database functions before importing camera
-db_mock = MagicMock()
-db_mock.get_device_by_id = MagicMock(return_value=None)
-db_mock.insert_device = MagicMock()
-db_mock.insert_event = MagicMock()
-
-# Add picamera2 mock to sys.modules
-sys.modules["picamera2"] = picamera2_mock
-sys.modules["picamera2.encoders"] = picamera2_mock.encoders
-
-# Import after mocks
+# picamera2 is replaced in sys.modules by conftest.pytest_configure
+from src.sensors import camera
 from src.sensors.camera import (
     DEVICE_ID,
     DEVICE_NAME,
@@ -44,9 +23,6 @@ from src.sensors.camera import (
     RECORDING_DURATION_SECONDS,
     VIDEO_FILE_PATH,
     _camera_loop,
-    _camera_thread,
-    _is_running,
-    _picamera_object,
     _process_and_publish_frame,
     _setup_camera,
     start_camera_streaming,
@@ -56,57 +32,73 @@ from src.sensors.camera import (
 # Test constants
 WAIT_TIMEOUT = 5  # seconds
 TEST_HOME_ID = "test_home_123"
-MQTT_CAMERA_LIVE_TOPIC = "/live"  # Match the actual topic in camera.py
+_FAKE_JPEG = b"test_image_data"
+
+# Shared successful publish result; publish_frame reads rc, mid and is_published()
+_MSG_INFO_OK = SimpleNamespace(
+    rc=mqtt.MQTT_ERR_SUCCESS, mid=0, is_published=lambda: True
+)
+
+REQUIRED_ENV_VARS = (
+    "SUPABASE_URL",
+    "SUPABASE_KEY",
+    "MQTT_BROKER_URL",
+    "MQTT_USERNAME",
+    "MQTT_PASSWORD",
+)
+
+
+@pytest.fixture(scope="session")
+def missing_env_vars():
+    """Names of the required environment variables that are not set."""
+    return [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
 
 
 @pytest.fixture(autouse=True)
-def check_env_vars():
+def check_env_vars(missing_env_vars):
     """Check if required environment variables are set."""
-    required_vars = [
-        "SUPABASE_URL",
-        "SUPABASE_KEY",
-        "MQTT_BROKER_URL",
-        "MQTT_USERNAME",
-        "MQTT_PASSWORD",
-    ]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    if missing_vars:
+    if missing_env_vars:
         pytest.skip(
-            f"Missing required environment variables: {', '.join(missing_vars)}"
+            f"Missing required environment variables: {', '.join(missing_env_vars)}"
         )
 
 
 @pytest.fixture(autouse=True)
-def reset_camera_state():
-    """Reset camera state before each test."""
-    global _picamera_object, _is_running
-    _is_running.clear()
-    _picamera_object = None
+def reset_camera_state(mocker):
+    """Give each test its own camera module state.
+
+    The module globals are patched rather than cleared in place, so a test
+    never sees state left behind by an earlier one, whichever order (or
+    pytest-xdist worker) the tests run in.
+    """
+    mocker.patch.object(camera, "_is_running", threading.Event())
+    mocker.patch.object(camera, "_picamera_object", None)
+    mocker.patch.object(camera, "_camera_thread", None)
     yield
-    stop_camera_streaming(TEST_HOME_ID)
+    # Only tests that got the camera (or its thread) going need the stop
+    # sequence, which joins the thread, updates the DB and sleeps
+    if camera._is_running.is_set() or camera._picamera_object or camera._camera_thread:
+        stop_camera_streaming(TEST_HOME_ID)
+
+
+@pytest.fixture(scope="session")
+def mqtt_client_template():
+    """MQTT client mock built once; autospec walks all of mqtt.Client."""
+    return create_autospec(mqtt.Client, instance=True)
 
 
 @pytest.fixture(autouse=True)
-def mock_mqtt_client(mocker):
+def mock_mqtt_client(mocker, mqtt_client_template):
     """Mock MQTT client with proper connection state tracking."""
-    mock_client_instance = MagicMock(spec=mqtt.Client)
+    mock_client_instance = mqtt_client_template
+    mock_client_instance.reset_mock(return_value=True, side_effect=True)
     mock_client_instance.is_connected.return_value = True
-    mock_client_instance.published_messages = []
-
-    def mock_publish_general(topic, payload, qos=0, retain=False):
-        msg_info = MagicMock()
-        msg_info.rc = mqtt.MQTT_ERR_SUCCESS
-        return msg_info
-
-    mock_client_instance.publish = MagicMock(side_effect=mock_publish_general)
+    mock_client_instance.publish = MagicMock(return_value=_MSG_INFO_OK)
 
     mocker.patch("src.utils.mqtt.get_mqtt_client", return_value=mock_client_instance)
     mocker.patch(
         "src.sensors.camera.get_mqtt_client", return_value=mock_client_instance
     )
-    mocker.patch(
-        "src.utils.mqtt._mqtt_client_instance", new=mock_client_instance, create=True
-    )
 
     return mock_client_instance
 
@@ -118,12 +110,13 @@ def mock_db(mocker):
         "devices": {},
         "events": [],
     }
+    # No test asserts on timestamps; one value per test is enough
+    now_iso = datetime.now(timezone.utc).isoformat()
 
-    def mock_get_device(device_id):
+    def mock_get_device(device_id, columns="*"):
         return db_state["devices"].get(device_id)
 
     def mock_insert_device(**kwargs):
-        now_iso = datetime.now(timezone.utc).isoformat()
         device = {
             "id": kwargs["device_id"],
             "home_id": kwargs["home_id"],
@@ -136,8 +129,15 @@ def mock_db(mocker):
         db_state["devices"][kwargs["device_id"]] = device
         return device
 
-    def mock_insert_event(**kwargs):
-        now_iso = datetime.now(timezone.utc).isoformat()
+    def mock_update_device_state(device_id, new_state):
+        device = db_state["devices"].get(device_id)
+        if device is not None:
+            device["current_state"] = new_state
+
+    def mock_transition_device_state(**kwargs):
+        device = db_state["devices"].get(kwargs["device_id"])
+        if device is not None:
+            device["current_state"] = kwargs["new_state"]
         event = {
             "id": len(db_state["events"]) + 1,
             "home_id": kwargs["home_id"],
@@ -154,51 +154,97 @@ def mock_db(mocker):
     # Patch database functions where they are used in camera.py
     mocker.patch("src.sensors.camera.get_device_by_id", side_effect=mock_get_device)
     mocker.patch("src.sensors.camera.insert_device", side_effect=mock_insert_device)
-    mocker.patch("src.sensors.camera.insert_event", side_effect=mock_insert_event)
+    mocker.patch(
+        "src.sensors.camera.update_device_state", side_effect=mock_update_device_state
+    )
+    mocker.patch(
+        "src.sensors.camera.transition_device_state",
+        side_effect=mock_transition_device_state,
+    )
 
     return db_state
 
 
+@pytest.fixture(scope="session")
+def zero_frame():
+    """Blank RGB frame shared by all tests, read-only so no test can alter it."""
+    frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    frame.setflags(write=False)
+    return frame
+
+
+class _FakeCamera:
+    """Picamera2 stand-in exposing only the attributes camera.py uses.
+
+    Each method is a plain Mock so tests can assert on calls, without
+    MagicMock creating a child for every other attribute looked up.
+    """
+
+    __slots__ = (
+        "create_video_configuration",
+        "configure",
+        "start",
+        "stop",
+        "capture_array",
+        "start_recording",
+        "stop_recording",
+        "close",
+        "recording",
+        "recording_started",
+        "recording_stopped",
+    )
+
+    def __init__(self, frame):
+        self.create_video_configuration = Mock(
+            return_value={"size": (FRAME_WIDTH, FRAME_HEIGHT), "format": "RGB888"}
+        )
+        self.configure = Mock(return_value=None)
+        self.start = Mock(return_value=None)
+        self.stop = Mock(return_value=None)
+        self.capture_array = Mock(return_value=frame)
+        self.close = Mock(return_value=None)
+        self.recording = False
+
+        # Signalled from the camera thread so tests can wait on recording
+        # calls instead of sleeping for a fixed time
+        self.recording_started = threading.Event()
+        self.recording_stopped = threading.Event()
+        self.start_recording = Mock(
+            side_effect=lambda *args, **kwargs: self.recording_started.set()
+        )
+        self.stop_recording = Mock(
+            side_effect=lambda *args, **kwargs: self.recording_stopped.set()
+        )
+
+
 @pytest.fixture(autouse=True)
-def mock_picamera2(mocker):
+def mock_picamera2(mocker, zero_frame):
     """Mock Picamera2 module and class."""
-    # Create mock camera instance
-    mock_camera = MagicMock()
+    mock_camera = _FakeCamera(zero_frame)
 
-    # Configure video configuration
-    mock_config = {"size": (FRAME_WIDTH, FRAME_HEIGHT), "format": "RGB888"}
-    mock_camera.create_video_configuration.return_value = mock_config
-    mock_camera.configure.return_value = None
-    mock_camera.start.return_value = None
+    # Patch the Picamera2 class to return our configured instance
+    mocker.patch("src.sensors.camera.Picamera2", Mock(return_value=mock_camera))
 
-    # Configure frame capture
-    frame_data = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
-    mock_camera.capture_array.return_value = frame_data
+    return mock_camera
 
-    # Configure recording state
-    mock_camera.recording = False
 
-    # Create a mock Picamera2 class that returns our configured instance
-    mock_picamera2_class = MagicMock(return_value=mock_camera)
+class _FakeImage:
+    """PIL image stand-in whose save() writes fixed bytes to the buffer."""
 
-    # Patch the Picamera2 class
-    mocker.patch("src.sensors.camera.Picamera2", mock_picamera2_class)
+    __slots__ = ()
 
-    return mock_camera
+    def save(self, buffer, format, **kwargs):
+        buffer.write(_FAKE_JPEG)
 
 
 @pytest.fixture
 def mock_image_processing(mocker):
     """Mock PIL Image processing."""
-    mock_image = MagicMock()
-
-    # Mock image.save to write some test data
-    def mock_save(buffer, format):
-        buffer.write(b"test_image_data")
-
-    mock_image.save.side_effect = mock_save
-    mocker.patch("PIL.Image.fromarray", return_value=mock_image)
-    return mock_image
+    fake_image = _FakeImage()
+    mocker.patch("PIL.Image.fromarray", return_value=fake_image)
+    # Force the PIL path even where TurboJPEG is installed
+    mocker.patch("src.sensors.camera._turbo_jpeg", None)
+    return fake_image
 
 
 @pytest.fixture(autouse=True)
@@ -210,76 +256,87 @@ def mock_cloudflare(mocker):
 
 
 @pytest.fixture
-def mock_mqtt_publishing(mocker, mock_mqtt_client):
-    """Mocks src.sensors.camera.publish_json for testing frame publishing logic."""
-
-    def side_effect_publish_json(topic, message_dict):  # Expects dictionary
-        # For the test, we can simulate the json.dumps to store what would be sent
-        try:
-            payload_str = json.dumps(message_dict)
-            mock_mqtt_client.published_messages.append(
-                {"topic": topic, "payload": payload_str}  # Store the string form
-            )
-        except Exception as e:
-            pytest.fail(f"Mock publish_json failed to dump or append: {e}")
-        # The actual publish_json function in src.utils.mqtt is void (returns None).
-        # MagicMock default return is fine.
-
+def mock_mqtt_publishing(mocker):
+    """Mocks src.sensors.camera.publish_frame for testing frame publishing logic."""
+    mocker.patch("src.sensors.camera.is_frame_backlogged", return_value=False)
     # Patch where it's used by the code under test (_process_and_publish_frame in src.sensors.camera)
-    return mocker.patch(
-        "src.sensors.camera.publish_json",
-        side_effect=side_effect_publish_json,  # Patch new name
-    )
+    return mocker.patch("src.sensors.camera.publish_frame")
+
+
+class _FakeThread:
+    """Stand-in for the camera thread: alive once started, never runs target."""
+
+    def __init__(self, target=None, args=(), kwargs=None):
+        self.daemon = False
+        self._alive = False
+
+    def start(self):
+        self._alive = True
+
+    def join(self, timeout=None):
+        self._alive = False
+
+    def is_alive(self):
+        return self._alive
+
+
+@pytest.fixture
+def no_camera_thread(mocker):
+    """Keep start_camera_streaming from running the real camera loop."""
+    mocker.patch("src.sensors.camera.threading", SimpleNamespace(Thread=_FakeThread))
 
 
 class TestCameraSetup:
     """Test cases for camera setup and initialization."""
 
-    def test_setup_camera_success(self, mock_picamera2):
-        """Test successful camera setup."""
-        assert _setup_camera() is True
-        mock_picamera2.create_video_configuration.assert_called_once()
-        mock_picamera2.configure.assert_called_once()
-        mock_picamera2.start.assert_called_once()
+    @pytest.mark.parametrize(
+        "configure_side_effect,expected",
+        [
+            (None, True),
+            (Exception("Camera init failed"), False),
+        ],
+        ids=["success", "failure"],
+    )
+    def test_setup_camera(self, mock_picamera2, configure_side_effect, expected):
+        """Test camera setup, its configuration and failure handling."""
+        mock_picamera2.configure.side_effect = configure_side_effect
 
-    def test_setup_camera_failure(self, mock_picamera2):
-        """Test camera setup failure handling."""
-        mock_picamera2.configure.side_effect = Exception("Camera init failed")
-        assert _setup_camera() is False
-        mock_picamera2.close.assert_called_once()
+        assert _setup_camera() is expected
 
-    def test_setup_camera_configuration(self, mock_picamera2):
-        """Test camera configuration parameters."""
-        _setup_camera()
         mock_picamera2.create_video_configuration.assert_called_once_with(
             main={"size": (FRAME_WIDTH, FRAME_HEIGHT), "format": "RGB888"}
         )
+        mock_picamera2.configure.assert_called_once()
+        if expected:
+            mock_picamera2.start.assert_called_once()
+        else:
+            mock_picamera2.close.assert_called_once()
 
 
 class TestCameraStreaming:
     """Test cases for camera streaming functionality."""
 
     def test_process_and_publish_frame(
-        self, mock_mqtt_client, mock_image_processing, mock_mqtt_publishing
+        self, mock_image_processing, mock_mqtt_publishing, zero_frame
     ):
         """Test frame processing and MQTT publishing."""
-        frame = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
-        _process_and_publish_frame(frame, TEST_HOME_ID)
+        _process_and_publish_frame(zero_frame, TEST_HOME_ID)
 
         # Verify published message
-        assert len(mock_mqtt_client.published_messages) == 1
-        published = mock_mqtt_client.published_messages[0]
-        assert published["topic"] == MQTT_CAMERA_LIVE_TOPIC
+        assert len(mock_mqtt_publishing.call_args_list) == 1
+        topic, payload = mock_mqtt_publishing.call_args_list[0].args
+        assert topic == MQTT_CAMERA_LIVE_TOPIC
 
-        message = json.loads(published["payload"])  # Should be the JSON string
+        message = orjson.loads(payload)  # JSON bytes, no decode step
         assert message["home_id"] == TEST_HOME_ID
         assert message["device_id"] == DEVICE_ID
         assert message["format"] == "jpeg"
         assert message["resolution"] == f"{FRAME_WIDTH}x{FRAME_HEIGHT}"
-        assert "data" in message  # Base64 encoded image data
-        assert isinstance(message["data"], str)  # Should be hex string
+        # Only check the image field is present; its content is the fake JPEG
+        image_b64 = message["image_b64"]
+        assert isinstance(image_b64, str) and image_b64
 
-    def test_start_camera_streaming(self, mock_db, mock_mqtt_client):
+    def test_start_camera_streaming(self, mock_db, mock_mqtt_client, no_camera_thread):
         """Test starting camera streaming service."""
         # Start streaming
         start_camera_streaming(TEST_HOME_ID)
@@ -299,22 +356,28 @@ class TestCameraStreaming:
         event = events[0]
         assert event["home_id"] == TEST_HOME_ID
         assert event["device_id"] == DEVICE_ID
-        assert event["event_type"] == "camera_started"
-        assert event["old_state"] == "offline"
+        assert event["event_type"] == "camera_changed"
+        # Registered as 'initializing', then switched online once started
+        assert event["old_state"] == "initializing"
         assert event["new_state"] == "online"
         assert event["read"] is False
 
     def test_stop_camera_streaming(
-        self, mock_mqtt_client, mock_db, mock_picamera2, mock_cloudflare
+        self,
+        mock_mqtt_client,
+        mock_db,
+        mock_picamera2,
+        mock_cloudflare,
+        no_camera_thread,
     ):
         """Test stopping camera streaming service."""
         # Start first
         start_camera_streaming(TEST_HOME_ID)
-        assert _is_running.is_set()
+        assert camera._is_running.is_set()
 
         # Then stop
         stop_camera_streaming(TEST_HOME_ID)
-        assert not _is_running.is_set()
+        assert not camera._is_running.is_set()
         mock_picamera2.close.assert_called()
 
 
@@ -328,53 +391,46 @@ class TestVideoRecording:
         # Mock os.path.exists to return True for video file
         mocker.patch("os.path.exists", return_value=True)
 
-        # We need to re-assign these to ensure they are fresh for this test's .called check
-        # mock_start_method = MagicMock()
-        # mock_stop_method = MagicMock()
-        # mock_picamera2.start_recording = mock_start_method
-        # mock_picamera2.stop_recording = mock_stop_method
-        # Instead, reset the mocks on the fixture's object
-        mock_picamera2.start_recording.reset_mock()
-        mock_picamera2.stop_recording.reset_mock()
-
         # Start camera streaming - this will do the *initial* start_recording
         start_camera_streaming(test_env["HOME_ID"])
-        time.sleep(0.1)  # Allow camera thread to attempt start_recording
+        assert mock_picamera2.recording_started.wait(WAIT_TIMEOUT)
 
-        # Now clear mocks again to only count calls during the segment switch
-        mock_picamera2.start_recording.reset_mock()
-        mock_picamera2.stop_recording.reset_mock()
+        # Clear the signals so only the segment switch sets them again
+        mock_picamera2.recording_started.clear()
+        mock_picamera2.recording_stopped.clear()
 
-        # Advance time to trigger segment switch
+        # Advance time to trigger segment switch; the camera loop's time.time()
+        # sees the advanced time on its next iteration
         mock_time.set_time(RECORDING_DURATION_SECONDS + 1)
-        # mock_time.advance(0.5) # Advancing time here might be less critical than ensuring the loop runs with the new base time
-        # The crucial part is that the camera loop's time.time() will now see the advanced time.
-        # The time.sleep within the camera loop is also mocked and will advance the controller's time.
-        time.sleep(
-            1.0
-        )  # Increased real sleep to allow camera thread to process with advanced mock time
+
+        assert mock_picamera2.recording_stopped.wait(WAIT_TIMEOUT)
+        assert mock_picamera2.recording_started.wait(WAIT_TIMEOUT)
 
     def test_recording_failure_handling(
         self, mock_picamera2, mock_cloudflare, test_env
     ):
         """Test handling of recording failures."""
-        mock_picamera2.start_recording.side_effect = Exception("Recording failed")
 
-        # Start camera streaming
+        def fail_start_recording(*args, **kwargs):
+            mock_picamera2.recording_started.set()
+            raise Exception("Recording failed")
+
+        mock_picamera2.start_recording.side_effect = fail_start_recording
+
+        # Start camera streaming and wait for the camera thread to attempt
+        # start_recording and handle the error
         start_camera_streaming(test_env["HOME_ID"])
-        time.sleep(
-            0.1
-        )  # Allow camera thread to attempt start_recording and handle error
+        assert mock_picamera2.recording_started.wait(WAIT_TIMEOUT)
 
         # Verify error handling
-        assert _is_running.is_set()  # Should keep running despite error
+        assert camera._is_running.is_set()  # Should keep running despite error
         mock_picamera2.stop_recording.assert_not_called()
 
 
 class TestErrorHandling:
     """Test cases for error handling scenarios."""
 
-    def test_mqtt_connection_failure(self, mock_mqtt_client, mock_db):
+    def test_mqtt_connection_failure(self, mock_mqtt_client, mock_db, no_camera_thread):
         """Test handling of MQTT connection failure."""
         # Configure MQTT client to be disconnected
         mock_mqtt_client.is_connected.return_value = False
@@ -383,7 +439,7 @@ class TestErrorHandling:
         start_camera_streaming(TEST_HOME_ID)
 
         # Verify camera is not running
-        assert not _is_running.is_set()
+        assert not camera._is_running.is_set()
 
         # Verify no device registration
         device = mock_db["devices"].get(DEVICE_ID)
@@ -393,28 +449,40 @@ class TestErrorHandling:
         events = mock_db["events"]
         assert len(events) == 0
 
-    def test_camera_initialization_failure(self, mock_picamera2, mock_db):
+    def test_camera_initialization_failure(
+        self, mock_picamera2, mock_db, no_camera_thread
+    ):
         """Test handling of camera initialization failure."""
         mock_picamera2.configure.side_effect = Exception("Camera init failed")
         start_camera_streaming(TEST_HOME_ID)
-        assert not _is_running.is_set()
+        assert not camera._is_running.is_set()
 
-    def test_r2_upload_failure(self, mock_picamera2, mock_cloudflare, mock_db, mocker):
+    def test_r2_upload_failure(
+        self, mock_picamera2, mock_cloudflare, mock_db, mock_time, mocker
+    ):
         """Test handling of R2 upload failure."""
-        # Mock os.path.exists to return True for video file
+        # Mock os.path.exists to return True for video file and skip ffmpeg
         mocker.patch("os.path.exists", return_value=True)
-        mock_cloudflare.return_value = False
+        mocker.patch("src.sensors.camera._convert_h264_to_mp4", return_value=True)
 
-        # Configure recording methods
-        mock_picamera2.start_recording = MagicMock()
-        mock_picamera2.stop_recording = MagicMock()
+        # Signalled when the camera thread attempts the (failing) upload
+        upload_attempted = threading.Event()
 
-        # Start camera streaming
+        def fail_upload(*args, **kwargs):
+            upload_attempted.set()
+            return False
+
+        mock_cloudflare.side_effect = fail_upload
+
+        # Start camera streaming and wait for the initial start_recording
         start_camera_streaming(TEST_HOME_ID)
-        assert _is_running.is_set()
-        time.sleep(
-            0.1
-        )  # Allow camera thread to process and attempt initial start recording
+        assert mock_picamera2.recording_started.wait(WAIT_TIMEOUT)
+
+        # Advance time past the segment length so the finished segment is uploaded
+        mock_time.set_time(RECORDING_DURATION_SECONDS + 1)
+
+        assert upload_attempted.wait(WAIT_TIMEOUT)
+        assert camera._is_running.is_set()  # Should keep running despite failure
 
     def test_update_camera_state(mock_db_functions_camera):
         """Test updating camera state in database."""
@@ -5,13 +5,29 @@ import pytest
 from src.utils.database import get_device_by_id, get_supabase_client
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="module", autouse=True)
 def check_env_vars():
     """Check if required environment variables are set."""
     if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_KEY"):
         pytest.skip("SUPABASE_URL or SUPABASE_KEY environment variables are not set")
 
 
+@pytest.fixture(scope="module")
+def devices_count_response():
+    """Run the devices count query once and share the response.
+
+    get_supabase_client() already returns the process-wide client, so the
+    connection is reused; this saves the repeated round trip.
+    """
+    return (
+        get_supabase_client()
+        .table("devices")
+        .select("id", count="exact")
+        .limit(0)
+        .execute()
+    )
+
+
 def test_get_nonexistent_device():
     """Test fetching a non-existent device."""
     test_device_id_non_existent = "device_id_that_does_not_exist_12345"
@@ -19,15 +35,9 @@ def test_get_nonexistent_device():
     assert device_info is None or (isinstance(device_info, dict) and not device_info)
 
 
-def test_database_connection():
+def test_database_connection(devices_count_response):
     """Test basic database connectivity."""
-    response = (
-        get_supabase_client()
-        .table("devices")
-        .select("id", count="exact")
-        .limit(0)
-        .execute()
-    )
+    response = devices_count_response
     assert hasattr(response, "data")
     assert isinstance(response.data, list)
     assert hasattr(response, "count")
@@ -0,0 +1,161 @@
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import database
+
+
+@pytest.fixture
+def write_queue(mocker):
+    """Give each test its own write queue so no real flush thread sees it."""
+    test_queue = queue.SimpleQueue()
+    mocker.patch.object(database, "_write_queue", test_queue)
+    return test_queue
+
+
+@pytest.fixture
+def flushed_batches(mocker):
+    """Record the batches _flush_loop hands to _flush_batch."""
+    recorded = SimpleNamespace(batches=[], flushed=threading.Event())
+
+    def record_batch(batch):
+        recorded.batches.append([row for _, row, _ in batch])
+        recorded.flushed.set()
+
+    mocker.patch.object(database, "_flush_batch", side_effect=record_batch)
+    return recorded
+
+
+def _queue_rows(write_queue, count, table="event_log"):
+    for i in range(count):
+        write_queue.put((table, {"id": i}, 0))
+
+
+def test_flush_loop_splits_batches_at_batch_size(write_queue, flushed_batches):
+    """Rows beyond WRITE_BATCH_SIZE go into the next batch."""
+    _queue_rows(write_queue, database.WRITE_BATCH_SIZE * 2 + 5)
+    write_queue.put(database._FLUSH_STOP)
+
+    database._flush_loop()
+
+    assert [len(batch) for batch in flushed_batches.batches] == [
+        database.WRITE_BATCH_SIZE,
+        database.WRITE_BATCH_SIZE,
+        5,
+    ]
+
+
+def test_flush_loop_flushes_partial_batch_after_interval(
+    write_queue, flushed_batches, mocker
+):
+    """A partial batch is written once WRITE_FLUSH_INTERVAL passes without more rows."""
+    mocker.patch.object(database, "WRITE_FLUSH_INTERVAL", 0.01)
+    flush_thread = threading.Thread(target=database._flush_loop, daemon=True)
+    flush_thread.start()
+
+    _queue_rows(write_queue, 3)
+    assert flushed_batches.flushed.wait(2.0)
+    assert flushed_batches.batches == [[{"id": 0}, {"id": 1}, {"id": 2}]]
+
+    write_queue.put(database._FLUSH_STOP)
+    flush_thread.join(timeout=2.0)
+    assert not flush_thread.is_alive()
+    assert len(flushed_batches.batches) == 1  # Nothing left to write on stop
+
+
+def test_flush_batch_groups_rows_by_table(mocker):
+    """Each table gets one write with every row stamped with created_at."""
+    write_batch = mocker.patch.object(database, "_write_batch")
+    batch = [
+        ("event_log", {"id": 1}, 1_700_000_000_000_000_000),
+        ("alert_log", {"id": 2}, 1_700_000_000_000_000_000),
+        ("event_log", {"id": 3}, 1_700_000_000_500_000_000),
+    ]
+
+    database._flush_batch(batch)
+
+    written = {call.args[0]: call.args[1] for call in write_batch.call_args_list}
+    assert written == {
+        "event_log": [
+            {"id": 1, "created_at": "2023-11-14T22:13:20.000000+00:00"},
+            {"id": 3, "created_at": "2023-11-14T22:13:20.500000+00:00"},
+        ],
+        "alert_log": [{"id": 2, "created_at": "2023-11-14T22:13:20.000000+00:00"}],
+    }
+
+
+def test_enqueue_insert_starts_one_flush_thread(write_queue, mocker):
+    """Queuing rows starts the flush thread once and passes the rows through it."""
+    mocker.patch.object(database, "_flush_thread", None)
+    fake_thread = mocker.MagicMock()
+    fake_thread.is_alive.return_value = True
+    thread_class = mocker.patch.object(
+        database.threading, "Thread", return_value=fake_thread
+    )
+
+    database._enqueue_insert("event_log", {"id": 1})
+    database._enqueue_insert("alert_log", {"id": 2})
+
+    thread_class.assert_called_once()
+    fake_thread.start.assert_called_once()
+    queued = [write_queue.get_nowait()[:2] for _ in range(2)]
+    assert queued == [("event_log", {"id": 1}), ("alert_log", {"id": 2})]
+
+
+def test_flush_remaining_writes_mixed_batch_after_executor_shutdown(
+    write_queue, mocker
+):
+    """Rows for both tables are written inline once the executor refuses work."""
+    write_batch = mocker.patch.object(database, "_write_batch")
+    # Same state as at interpreter shutdown: submit() raises RuntimeError
+    stopped_executor = ThreadPoolExecutor(max_workers=1)
+    stopped_executor.shutdown()
+    mocker.patch.object(database, "_write_executor", stopped_executor)
+
+    write_queue.put(("event_log", {"id": 1}, 0))
+    write_queue.put(("alert_log", {"id": 2}, 0))
+    flush_thread = threading.Thread(target=database._flush_loop, daemon=True)
+    mocker.patch.object(database, "_flush_thread", flush_thread)
+    flush_thread.start()
+
+    database._flush_remaining()
+
+    assert not flush_thread.is_alive()
+    written = {call.args[0]: call.args[1] for call in write_batch.call_args_list}
+    assert [row["id"] for row in written["event_log"]] == [1]
+    assert [row["id"] for row in written["alert_log"]] == [2]
+
+
+def test_write_batch_falls_back_to_postgrest_after_copy_error(mocker):
+    """A failed COPY sends the same rows through a PostgREST insert."""
+    mocker.patch.object(database, "_get_copy_pool", return_value=object())
+    copy_rows = mocker.patch.object(
+        database, "_copy_rows", side_effect=OSError("connection reset")
+    )
+    supabase = mocker.patch.object(database, "_supabase")
+    rows = [{"device_id": "lux_01"}, {"device_id": "lux_02"}]
+
+    database._write_batch("event_log", rows)
+
+    copy_rows.assert_called_once()
+    supabase.table.assert_called_once_with("event_log")
+    supabase.table.return_value.insert.assert_called_once_with(rows)
+
+
+def test_get_copy_pool_returns_none_when_pool_fails_to_open(mocker):
+    """An unreachable SUPABASE_DB_URL leaves batched writes on PostgREST."""
+    connection_pool = mocker.Mock(side_effect=OSError("connection refused"))
+    mocker.patch.dict(
+        sys.modules, {"psycopg_pool": SimpleNamespace(ConnectionPool=connection_pool)}
+    )
+    mocker.patch.object(database, "SUPABASE_DB_URL", "postgresql://db")
+    mocker.patch.object(database, "_copy_pool", None)
+    mocker.patch.object(database, "_copy_pool_checked", False)
+
+    assert database._get_copy_pool() is None
+    assert database._get_copy_pool() is None
+    connection_pool.assert_called_once()
@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+from functools import partial
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -9,14 +10,11 @@ from src.sensors.light import (
     LED_PIN,
     get_light_intensity,
     initialize_light,
-    levels,
     set_light_intensity,
     turn_light_off,
     turn_light_on,
 )
-
-# Assuming the PWMLED is on pin 2 as in light.py
-LED_PIN = 2
+from src.utils.database import DEVICE_STATE_BRIGHTNESS_COLUMNS
 
 
 @pytest.fixture(autouse=True)
@@ -50,20 +48,6 @@ def mock_pwmled(mocker):
     )  # Return both for different assertion needs
 
 
-@pytest.fixture
-def mock_db_functions_light(mocker):
-    """Mock database utility functions for light module."""
-    mocks = {
-        "get_device_by_id": mocker.patch("src.sensors.light.get_device_by_id"),
-        "insert_device": mocker.patch("src.sensors.light.insert_device"),
-        "update_device_state": mocker.patch("src.sensors.light.update_device_state"),
-        "insert_event": mocker.patch("src.sensors.light.insert_event"),
-    }
-    # Set up default return values
-    mocks["get_device_by_id"].return_value = None  # Default to device not found
-    return mocks
-
-
 HOME_ID_TEST = "test_home_light_123"
 USER_ID_TEST = "test_user_light_123"
 
@@ -81,7 +65,9 @@ def test_initialize_light_new_device(mock_pwmled, mock_db_functions_light):
     # Assert
     mock_pwmled_class.assert_called_once_with(LED_PIN)
 
-    mock_db_functions_light["get_device_by_id"].assert_called_once_with(DEVICE_ID)
+    mock_db_functions_light["get_device_by_id"].assert_called_once_with(
+        DEVICE_ID, DEVICE_STATE_BRIGHTNESS_COLUMNS
+    )
     mock_db_functions_light["insert_device"].assert_called_once_with(
         device_id=DEVICE_ID,
         home_id=HOME_ID_TEST,
@@ -105,7 +91,9 @@ def test_initialize_light_new_device_initially_on(mock_pwmled, mock_db_functions
 
     # Assert
     mock_pwmled_class.assert_called_once_with(LED_PIN)
-    mock_db_functions_light["get_device_by_id"].assert_called_once_with(DEVICE_ID)
+    mock_db_functions_light["get_device_by_id"].assert_called_once_with(
+        DEVICE_ID, DEVICE_STATE_BRIGHTNESS_COLUMNS
+    )
     mock_db_functions_light["insert_device"].assert_called_once_with(
         device_id=DEVICE_ID,
         home_id=HOME_ID_TEST,
@@ -134,69 +122,68 @@ def test_initialize_light_existing_device(mock_pwmled, mock_db_functions_light):
 
     # Assert
     mock_pwmled_class.assert_called_once_with(LED_PIN)
-    mock_db_functions_light["get_device_by_id"].assert_called_once_with(DEVICE_ID)
-    mock_db_functions_light["insert_device"].assert_not_called()
-
-
-def test_set_light_intensity_valid_level(mock_pwmled, mock_db_functions_light):
-    """Test setting light intensity to a valid level."""
-    # Arrange
-    mock_led_instance, _ = mock_pwmled
-    initialize_light(
-        home_id=HOME_ID_TEST, user_id=USER_ID_TEST
-    )  # Ensure initialized state for context
-
-    mock_led_instance.value = 0.0  # Start from off state
-    target_level_float = 0.5
-    expected_brightness_int = 50
-    expected_state_str = "on"
-
-    # Act
-    set_light_intensity(home_id=HOME_ID_TEST, level=target_level_float)
-
-    # Assert
-    assert mock_led_instance.value == target_level_float
-    mock_db_functions_light["update_device_state"].assert_called_once_with(
-        DEVICE_ID,
-        {"current_state": expected_state_str, "brightness": expected_brightness_int},
-    )
-    mock_db_functions_light["insert_event"].assert_called_once_with(
-        home_id=HOME_ID_TEST,
-        device_id=DEVICE_ID,
-        event_type="light_intensity_changed",
-        old_state="0.0",
-        new_state=str(target_level_float),
-        event_data={"brightness": expected_brightness_int},
+    mock_db_functions_light["get_device_by_id"].assert_called_once_with(
+        DEVICE_ID, DEVICE_STATE_BRIGHTNESS_COLUMNS
     )
+    mock_db_functions_light["insert_device"].assert_not_called()
 
 
-def test_set_light_intensity_turn_off(mock_pwmled, mock_db_functions_light):
-    """Test setting light intensity to 0.0 (off)."""
+@pytest.mark.parametrize(
+    "initial_value,change_light,target_level,expected_state,expected_brightness",
+    [
+        pytest.param(
+            0.0,
+            partial(set_light_intensity, level=0.5),
+            0.5,
+            "on",
+            50,
+            id="set_valid_level",
+        ),
+        pytest.param(
+            1.0,
+            partial(set_light_intensity, level=0.0),
+            0.0,
+            "off",
+            0,
+            id="set_turn_off",
+        ),
+        pytest.param(0.0, turn_light_on, 1.0, "on", 100, id="turn_light_on"),
+        pytest.param(1.0, turn_light_off, 0.0, "off", 0, id="turn_light_off"),
+    ],
+)
+def test_change_light_intensity(
+    mock_pwmled,
+    mock_db_functions_light,
+    initial_value,
+    change_light,
+    target_level,
+    expected_state,
+    expected_brightness,
+):
+    """Test setting, turning on and turning off the light."""
     # Arrange
     mock_led_instance, _ = mock_pwmled
     initialize_light(home_id=HOME_ID_TEST, user_id=USER_ID_TEST)
-
-    mock_led_instance.value = 1.0  # Start from on state
-    target_level_float = 0.0
-    expected_brightness_int = 0
-    expected_state_str = "off"
+    mock_led_instance.value = initial_value
+    # Clear mocks from initialize_light call to focus on the change's effects
+    mock_db_functions_light["update_device_state"].reset_mock()
+    mock_db_functions_light["insert_event"].reset_mock()
 
     # Act
-    set_light_intensity(home_id=HOME_ID_TEST, level=target_level_float)
+    change_light(home_id=HOME_ID_TEST)
 
     # Assert
-    assert mock_led_instance.value == target_level_float
+    assert mock_led_instance.value == target_level
     mock_db_functions_light["update_device_state"].assert_called_once_with(
         DEVICE_ID,
-        {"current_state": expected_state_str, "brightness": expected_brightness_int},
+        {"current_state": expected_state, "brightness": expected_brightness},
     )
     mock_db_functions_light["insert_event"].assert_called_once_with(
         home_id=HOME_ID_TEST,
         device_id=DEVICE_ID,
-        event_type="light_intensity_changed",
-        old_state="1.0",
-        new_state=str(target_level_float),
-        event_data={"brightness": expected_brightness_int},
+        event_type="light_changed",
+        old_state=str(initial_value),
+        new_state=str(target_level),
     )
 
 
@@ -216,68 +203,6 @@ def test_set_light_intensity_invalid_level(mock_pwmled, mock_db_functions_light)
     mock_db_functions_light["insert_event"].assert_not_called()
 
 
-def test_turn_light_on(mock_pwmled, mock_db_functions_light):
-    """Test turning the light on."""
-    # Arrange
-    mock_led_instance, _ = mock_pwmled
-    # Reset mocks for this specific test if initialize_light was called in a previous one within the same session for other reasons.
-    # However, pytest fixtures are typically function-scoped, so they reset. Explicit init is better.
-    initialize_light(home_id=HOME_ID_TEST, user_id=USER_ID_TEST)
-    mock_led_instance.value = 0.0  # Ensure light is off initially
-    # Clear mocks from initialize_light call to focus on turn_light_on's effects
-    mock_db_functions_light["update_device_state"].reset_mock()
-    mock_db_functions_light["insert_event"].reset_mock()
-
-    # Act
-    turn_light_on(home_id=HOME_ID_TEST)
-
-    # Assert
-    assert mock_led_instance.value == 1.0
-    mock_db_functions_light["update_device_state"].assert_called_once_with(
-        DEVICE_ID, {"current_state": "on", "brightness": 100}
-    )
-    mock_db_functions_light["insert_event"].assert_called_once_with(
-        home_id=HOME_ID_TEST,
-        device_id=DEVICE_ID,
-        event_type="light_intensity_changed",
-        old_state="0.0",
-        new_state="1.0",
-        event_data={"brightness": 100},
-    )
-
-
-def test_turn_light_off(mock_pwmled, mock_db_functions_light):
-    """Test turning the light off."""
-    # Arrange
-    mock_led_instance, _ = mock_pwmled
-    initialize_light(home_id=HOME_ID_TEST, user_id=USER_ID_TEST)
-    mock_led_instance.value = 1.0  # Ensure light is on initially
-    # Clear mocks from initialize_light call
-    mock_db_functions_light["update_device_state"].reset_mock()
-    mock_db_functions_light["insert_event"].reset_mock()
-    mock_db_functions_light[
-        "insert_device"
-    ].reset_mock()  # If it was a new device test before
-    mock_db_functions_light["get_device_by_id"].reset_mock()
-
-    # Act
-    turn_light_off(home_id=HOME_ID_TEST)
-
-    # Assert
-    assert mock_led_instance.value == 0.0
-    mock_db_functions_light["update_device_state"].assert_called_once_with(
-        DEVICE_ID, {"current_state": "off", "brightness": 0}
-    )
-    mock_db_functions_light["insert_event"].assert_called_once_with(
-        home_id=HOME_ID_TEST,
-        device_id=DEVICE_ID,
-        event_type="light_intensity_changed",
-        old_state="1.0",
-        new_state="0.0",
-        event_data={"brightness": 0},
-    )
-
-
 def test_get_light_intensity(mock_pwmled):
     """Test getting the current light intensity."""
     # Arrange
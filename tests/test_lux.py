@@ -1,130 +1,164 @@
-import sys
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, PropertyMock, call
 
 import pytest
 
-# Mock the PiicoDev_VEML6030 module before it's imported by src.sensors.lux
-# This should ideally be in conftest.py if it affects multiple test files.
-# Ensure this global mock is in place before `from src.sensors import lux`
-if "PiicoDev_VEML6030" not in sys.modules:
-    mock_veml6030_module_global = MagicMock(name="GlobalPiicoDevModuleMock")
-    mock_veml6030_instance_global = MagicMock(name="GlobalPiicoDevInstanceMock")
-    mock_veml6030_module_global.PiicoDev_VEML6030.return_value = (
-        mock_veml6030_instance_global
-    )
-    sys.modules["PiicoDev_VEML6030"] = mock_veml6030_module_global
-
 from src.sensors import lux
 
 DEVICE_ID = "lux_sensor_01"
-DEVICE_NAME = "Ambient Light Sensor"
-DEVICE_TYPE = "lux_sensor"
-EVENT_TYPE = "lux_level"
+DEVICE_NAME = "Light Level Sensor"
+DEVICE_TYPE = "tsl2591"
+EVENT_TYPE = "lux_changed"
 HOME_ID_TEST = "test_home_lux_01"
+LOG_PREFIX = f"[{DEVICE_ID} ({DEVICE_NAME})]"
 
 
-@pytest.fixture
-def mock_piico_dev(mocker):
-    mock_sensor_class = MagicMock(name="PiicoDev_VEML6030_Class_Fixture")
-    mock_sensor_instance = MagicMock(name="PiicoDev_VEML6030_Instance_Fixture")
-    mock_sensor_class.return_value = mock_sensor_instance
-    # This patch will be active for tests using this fixture.
-    # It overrides the global sys.modules mock for the scope of the test.
-    mocker.patch("src.sensors.lux.PiicoDev_VEML6030", mock_sensor_class)
-    return mock_sensor_instance
+class _SyncThread:
+    """Stand-in for the monitoring thread: the test runs its target via run()."""
 
+    def __init__(self, target, *args, **kwargs):
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self._alive = True  # start_monitoring_thread returns a started thread
 
-@pytest.fixture
-def mock_db_lux_functions(mocker):
-    db_mocks = {
-        "get_device_by_id": mocker.patch("src.sensors.lux.get_device_by_id"),
-        "insert_device": mocker.patch("src.sensors.lux.insert_device"),
-        "get_latest_device_state": mocker.patch(
-            "src.sensors.lux.get_latest_device_state"
-        ),
-        "update_device_state": mocker.patch("src.sensors.lux.update_device_state"),
-        "insert_event": mocker.patch("src.sensors.lux.insert_event"),
-    }
-    db_mocks["get_device_by_id"].return_value = None
-    db_mocks["get_latest_device_state"].return_value = None
-    return db_mocks
+    def run(self):
+        self.target(*self.args, **self.kwargs)
+        self._alive = False
 
+    def join(self, timeout=None):
+        self._alive = False
 
-@pytest.fixture
-def mock_lux_logger(mocker):
-    return mocker.patch("src.sensors.lux.logger")
+    def is_alive(self):
+        return self._alive
 
 
-@pytest.fixture
-def mock_lux_time_sleep(mocker):
-    # Important: Ensure this mocks time.sleep *within the lux module* specifically.
+@pytest.fixture(autouse=True)
+def mock_start_monitoring_thread(mocker):
+    """Keep start_lux_monitoring from spawning a real OS thread."""
     return mocker.patch(
-        "src.sensors.lux.time.sleep", MagicMock(name="lux_time_sleep_fixture")
+        "src.sensors.lux.start_monitoring_thread", side_effect=_SyncThread
     )
 
 
+@pytest.fixture
+def mock_tsl2591(mocker):
+    mocker.patch("src.sensors.lux.board")
+    mocker.patch("src.sensors.lux.busio")
+    mock_sensor_instance = MagicMock(name="TSL2591_Instance_Fixture")
+    mock_sensor_instance.infrared = 0
+    mock_sensor_instance.full_spectrum = 0
+    # lux is a property on the real sensor; scripted through lux_reading
+    mock_sensor_instance.lux_reading = PropertyMock(return_value=100.0)
+    type(mock_sensor_instance).lux = mock_sensor_instance.lux_reading
+    mocker.patch(
+        "src.sensors.lux.adafruit_tsl2591.TSL2591", return_value=mock_sensor_instance
+    )
+    return mock_sensor_instance
+
+
+def _reset_lux_globals():
+    lux._is_monitoring.clear()
+    # Only a test that started monitoring leaves a thread behind; the
+    # others (e.g. categorize_lux) skip the join entirely
+    thread = lux._monitoring_thread
+    if thread is not None and thread.is_alive():
+        thread.join(timeout=0.6)
+    lux._monitoring_thread = None
+    lux._sensor = None
+    lux._i2c = None
+
+
 @pytest.fixture(autouse=True)
 def reset_lux_module_state(
     mock_lux_time_sleep,
 ):  # mock_lux_time_sleep is auto-used via this fixture
-    lux._is_monitoring.clear()
-    if lux._monitoring_thread and lux._monitoring_thread.is_alive():
-        lux._monitoring_thread.join(timeout=0.2)
-    lux._monitoring_thread = None
-    lux._sensor_instance = None
+    _reset_lux_globals()
     yield
-    if lux._is_monitoring.is_set() or (
-        lux._monitoring_thread and lux._monitoring_thread.is_alive()
-    ):
-        lux._is_monitoring.clear()
-        if lux._monitoring_thread and lux._monitoring_thread.is_alive():
-            lux._monitoring_thread.join(timeout=0.6)
-    lux._monitoring_thread = None
-    lux._sensor_instance = None
+    _reset_lux_globals()
+
+
+@pytest.fixture
+def drive_loop(mock_lux_time_sleep):
+    """Run the monitoring loop on the test's thread until it has slept n times.
+
+    Returns a callable taking n; it returns the total number of sleeps,
+    including any the loop makes after being told to stop.
+    """
+
+    def _drive(n):
+        def stop_after_n_sleeps(*args):
+            if mock_lux_time_sleep.call_count >= n:
+                lux._is_monitoring.clear()  # Signal the loop to stop
+
+        mock_lux_time_sleep.side_effect = stop_after_n_sleeps
+        lux._monitoring_thread.run()
+        return mock_lux_time_sleep.call_count
+
+    return _drive
 
 
 # --- Pytest-style test functions START HERE ---
 
 
-def test_categorize_lux_pytest():
-    assert lux.categorize_lux(25) == "Night"
-    assert lux.categorize_lux(49) == "Night"
-    assert lux.categorize_lux(50) == "Light Open"
-    assert lux.categorize_lux(150) == "Light Open"
-    assert lux.categorize_lux(299) == "Light Open"
-    assert lux.categorize_lux(300) == "Day"
-    assert lux.categorize_lux(1000) == "Day"
+@pytest.mark.parametrize(
+    "lux_value,expected",
+    [
+        (5, "Night"),
+        (19, "Night"),
+        (20, "Light Open"),
+        (150, "Light Open"),
+        (499, "Light Open"),
+        (500, "Day"),
+        (1000, "Day"),
+    ],
+)
+def test_categorize_lux_pytest(lux_value, expected):
+    assert lux.categorize_lux(lux_value) == expected
 
 
 def test_start_monitoring_registers_new_device_pytest(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_logger
+    mock_tsl2591, mock_db_lux_functions, mock_lux_logger, mock_start_monitoring_thread
 ):
-    mock_db_lux_functions["get_device_by_id"].return_value = None
+    mock_db_lux_functions["get_device_with_latest_state"].return_value = None
     assert lux.start_lux_monitoring(HOME_ID_TEST) is True
-    mock_db_lux_functions["get_device_by_id"].assert_called_once_with(DEVICE_ID)
+    mock_db_lux_functions["get_device_with_latest_state"].assert_called_once_with(
+        HOME_ID_TEST, DEVICE_ID
+    )
     mock_db_lux_functions["insert_device"].assert_called_once_with(
         device_id=DEVICE_ID,
         home_id=HOME_ID_TEST,
         name=DEVICE_NAME,
         type=DEVICE_TYPE,
-        current_state="unknown",
+        current_state="Light Open",
+    )
+    mock_start_monitoring_thread.assert_called_once_with(
+        lux._lux_monitoring_loop, HOME_ID_TEST, None
     )
     assert lux._monitoring_thread is not None
     assert lux._monitoring_thread.is_alive()
     assert lux._is_monitoring.is_set()
-    assert lux._sensor_instance == mock_piico_dev
+    assert lux._sensor == mock_tsl2591
 
 
 def test_start_monitoring_existing_device_pytest(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_logger
+    mock_tsl2591, mock_db_lux_functions, mock_lux_logger, mock_start_monitoring_thread
 ):
-    mock_db_lux_functions["get_device_by_id"].return_value = {
+    mock_db_lux_functions["get_device_with_latest_state"].return_value = {
         "id": DEVICE_ID,
-        "currentState": "Day",
+        "current_state": "Day",
+        "latest_state": "Day",
     }
     assert lux.start_lux_monitoring(HOME_ID_TEST) is True
-    mock_db_lux_functions["get_device_by_id"].assert_called_once_with(DEVICE_ID)
+    mock_db_lux_functions["get_device_with_latest_state"].assert_called_once_with(
+        HOME_ID_TEST, DEVICE_ID
+    )
     mock_db_lux_functions["insert_device"].assert_not_called()
+    mock_db_lux_functions["update_device_state"].assert_called_once_with(
+        device_id=DEVICE_ID, new_state="Light Open"
+    )
+    mock_start_monitoring_thread.assert_called_once_with(
+        lux._lux_monitoring_loop, HOME_ID_TEST, "Day"
+    )
     assert lux._monitoring_thread is not None
     assert lux._monitoring_thread.is_alive()
 
@@ -132,22 +166,24 @@ def test_start_monitoring_existing_device_pytest(
 def test_start_monitoring_sensor_init_failure_pytest(
     mock_db_lux_functions, mock_lux_logger, mocker
 ):
-    # This test specifically needs to mock PiicoDev_VEML6030 instantiation to fail.
-    # mocker is used directly here, instead of relying on mock_piico_dev fixture which provides a *successful* instance.
-    mock_failing_sensor_class = MagicMock(
-        side_effect=Exception("Sensor HW Error From Pytest")
+    # This test specifically needs to mock TSL2591 instantiation to fail.
+    # mocker is used directly here, instead of relying on mock_tsl2591 fixture which provides a *successful* instance.
+    mocker.patch("src.sensors.lux.board")
+    mocker.patch("src.sensors.lux.busio")
+    mocker.patch(
+        "src.sensors.lux.adafruit_tsl2591.TSL2591",
+        side_effect=Exception("Sensor HW Error From Pytest"),
     )
-    mocker.patch("src.sensors.lux.PiicoDev_VEML6030", mock_failing_sensor_class)
     assert lux.start_lux_monitoring(HOME_ID_TEST) is False
     mock_lux_logger.error.assert_any_call(
-        f"[{DEVICE_ID} ({DEVICE_NAME})] Error starting lux monitoring: Sensor HW Error From Pytest"
+        f"{LOG_PREFIX} Error starting lux monitoring: Sensor HW Error From Pytest"
     )
     assert lux._monitoring_thread is None
     assert not lux._is_monitoring.is_set()
 
 
 def test_start_monitoring_already_running_pytest(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_logger
+    mock_tsl2591, mock_db_lux_functions, mock_lux_logger
 ):
     assert lux.start_lux_monitoring(HOME_ID_TEST) is True
     thread1 = lux._monitoring_thread
@@ -155,7 +191,7 @@ def test_start_monitoring_already_running_pytest(
     assert lux.start_lux_monitoring(HOME_ID_TEST) is True  # Try starting again
     thread2 = lux._monitoring_thread
     mock_lux_logger.info.assert_any_call(
-        f"[{DEVICE_ID} ({DEVICE_NAME})] Monitoring is already running for HOME_ID: {HOME_ID_TEST}. Will not start again."
+        f"{LOG_PREFIX} Monitoring is already running for HOME_ID: {HOME_ID_TEST}. Will not start again."
     )
     # Ensure other init logs weren't repeated
     assert mock_lux_logger.info.call_count == call_count_logger_info_before + 1
@@ -163,58 +199,43 @@ def test_start_monitoring_already_running_pytest(
 
 
 def test_lux_monitoring_loop_existing_device(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_time_sleep, mock_lux_logger
+    mock_tsl2591,
+    mock_db_lux_functions,
+    mock_lux_time_sleep,
+    mock_lux_logger,
+    drive_loop,
 ):
     """Test the lux monitoring loop with an existing device."""
     # Arrange
-    mock_db_lux_functions["get_device_by_id"].return_value = {
+    mock_db_lux_functions["get_device_with_latest_state"].return_value = {
         "id": DEVICE_ID,
         "home_id": HOME_ID_TEST,
         "name": DEVICE_NAME,
         "type": DEVICE_TYPE,
         "current_state": "Day",
+        "latest_state": None,
     }
 
-    mock_piico_dev.read.side_effect = [
-        25.0,
-        350.0,
+    # One reading at start, then one per loop iteration
+    mock_tsl2591.lux_reading.side_effect = [
+        100.0,
+        5.0,
+        600.0,
         Exception("Read called too many times"),
     ]
-    mock_db_lux_functions["get_latest_device_state"].side_effect = [None, "Night"]
-
-    sleep_call_count = 0
-
-    def sleep_controller(*args):
-        nonlocal sleep_call_count
-        sleep_call_count += 1
-        if sleep_call_count >= 2:  # After the second time.sleep(5) in the loop
-            lux._is_monitoring.clear()  # Signal the loop to stop
-
-    mock_lux_time_sleep.side_effect = sleep_controller
 
     lux.start_lux_monitoring(HOME_ID_TEST)
-    current_thread = lux._monitoring_thread
-    if current_thread and current_thread.is_alive():
-        current_thread.join(timeout=2.5)
-
-    assert not (
-        current_thread and current_thread.is_alive()
-    ), "Thread did not terminate as expected"
+    mock_db_lux_functions["update_device_state"].reset_mock()
+    sleep_call_count = drive_loop(2)  # Stop after the second time.sleep(5)
 
-    mock_db_lux_functions["update_device_state"].assert_any_call(
-        device_id=DEVICE_ID, new_state="Night"
-    )
-    mock_db_lux_functions["insert_event"].assert_any_call(
+    mock_db_lux_functions["transition_device_state"].assert_any_call(
         home_id=HOME_ID_TEST,
         device_id=DEVICE_ID,
         event_type=EVENT_TYPE,
         old_state=None,
         new_state="Night",
     )
-    mock_db_lux_functions["update_device_state"].assert_any_call(
-        device_id=DEVICE_ID, new_state="Day"
-    )
-    mock_db_lux_functions["insert_event"].assert_any_call(
+    mock_db_lux_functions["transition_device_state"].assert_any_call(
         home_id=HOME_ID_TEST,
         device_id=DEVICE_ID,
         event_type=EVENT_TYPE,
@@ -223,100 +244,80 @@ def test_lux_monitoring_loop_existing_device(
     )
 
     assert (
-        mock_piico_dev.read.call_count == 2
-    ), f"Expected sensor read 2 times, got {mock_piico_dev.read.call_count}"
-    assert mock_db_lux_functions["update_device_state"].call_count == 2
-    assert mock_db_lux_functions["insert_event"].call_count == 2
+        mock_tsl2591.lux_reading.call_count == 3
+    ), f"Expected sensor read 3 times, got {mock_tsl2591.lux_reading.call_count}"
+    mock_db_lux_functions["update_device_state"].assert_not_called()
+    assert mock_db_lux_functions["transition_device_state"].call_count == 2
     assert (
         sleep_call_count == 2
     ), f"Expected sleep to be called 2 times from loop, got {sleep_call_count}"
 
 
 def test_lux_monitoring_loop_night_to_day_transition(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_time_sleep, mock_lux_logger
+    mock_tsl2591,
+    mock_db_lux_functions,
+    mock_lux_time_sleep,
+    mock_lux_logger,
+    drive_loop,
 ):
-    """Test the lux monitoring loop with a night to day transition."""
+    """Test the lux monitoring loop when the state stays at night."""
     # Arrange
-    mock_db_lux_functions["get_device_by_id"].return_value = {
+    mock_db_lux_functions["get_device_with_latest_state"].return_value = {
         "id": DEVICE_ID,
         "home_id": HOME_ID_TEST,
         "name": DEVICE_NAME,
         "type": DEVICE_TYPE,
         "current_state": "Night",
+        "latest_state": "Night",
     }
 
-    mock_piico_dev.read.side_effect = [
-        25.0,
-        25.0,
+    mock_tsl2591.lux_reading.side_effect = [
+        5.0,
+        5.0,
+        5.0,
         Exception("Read called too many times"),
     ]
-    mock_db_lux_functions["get_latest_device_state"].return_value = "Night"
-
-    sleep_call_count = 0
-
-    def sleep_controller(*args):
-        nonlocal sleep_call_count
-        sleep_call_count += 1
-        if sleep_call_count >= 2:
-            lux._is_monitoring.clear()
-
-    mock_lux_time_sleep.side_effect = sleep_controller
 
     lux.start_lux_monitoring(HOME_ID_TEST)
-    current_thread = lux._monitoring_thread
-    if current_thread and current_thread.is_alive():
-        current_thread.join(timeout=2.5)
-    assert not (
-        current_thread and current_thread.is_alive()
-    ), "Thread did not terminate as expected"
+    mock_db_lux_functions["update_device_state"].reset_mock()
+    sleep_call_count = drive_loop(2)
 
     mock_db_lux_functions["update_device_state"].assert_not_called()
-    mock_db_lux_functions["insert_event"].assert_not_called()
-    assert mock_piico_dev.read.call_count == 2
+    mock_db_lux_functions["transition_device_state"].assert_not_called()
+    assert mock_tsl2591.lux_reading.call_count == 3
     assert sleep_call_count == 2
 
 
 def test_monitoring_loop_sensor_read_exception_pytest(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_time_sleep, mock_lux_logger
+    mock_tsl2591,
+    mock_db_lux_functions,
+    mock_lux_time_sleep,
+    mock_lux_logger,
+    drive_loop,
 ):
-    mock_piico_dev.read.side_effect = Exception("Sensor Comm Error Pytest")
-    mock_db_lux_functions["get_latest_device_state"].return_value = None
-
-    # Loop: read fails -> except: logger.error, time.sleep(10) -> then loop tries time.sleep(5)
-    # We want to stop it after the time.sleep(10) in the except block.
-    sleep_calls_in_exception_test = {"count": 0}
-
-    def sleep_controller_for_exception(duration):
-        sleep_calls_in_exception_test["count"] += 1
-        if (
-            duration == 10 and sleep_calls_in_exception_test["count"] == 1
-        ):  # First sleep is 10s in except block
-            lux._is_monitoring.clear()  # Signal stop
-        # The loop should not call the second sleep(5) if flag is cleared.
-
-    mock_lux_time_sleep.side_effect = sleep_controller_for_exception
+    mock_tsl2591.lux_reading.side_effect = [
+        100.0,
+        Exception("Sensor Comm Error Pytest"),
+    ]
 
     lux.start_lux_monitoring(HOME_ID_TEST)
-    current_thread = lux._monitoring_thread
-    if current_thread and current_thread.is_alive():
-        current_thread.join(timeout=2.5)
-    assert not (
-        current_thread and current_thread.is_alive()
-    ), "Thread did not terminate as expected"
+    mock_db_lux_functions["update_device_state"].reset_mock()
+    # Read fails -> logger.error, time.sleep(10) in the except block, which
+    # stops the loop; the trailing time.sleep(5) still runs once
+    drive_loop(1)
 
     mock_lux_logger.error.assert_any_call(
-        f"[{DEVICE_ID} ({DEVICE_NAME})] An unexpected error occurred in the monitoring loop: Sensor Comm Error Pytest"
+        f"{LOG_PREFIX} An unexpected error occurred in the monitoring loop: Sensor Comm Error Pytest"
     )
     mock_db_lux_functions["update_device_state"].assert_not_called()
-    mock_db_lux_functions["insert_event"].assert_not_called()
-    assert mock_piico_dev.read.call_count == 1
-    assert (
-        sleep_calls_in_exception_test["count"] >= 1
-    )  # Should call sleep at least once (the 10s one)
+    mock_db_lux_functions["transition_device_state"].assert_not_called()
+    assert mock_tsl2591.lux_reading.call_count == 2
+    assert lux._sensor is None  # Dropped so the next iteration re-initializes it
+    assert mock_lux_time_sleep.call_args_list == [call(10), call(5)]
 
 
 def test_stop_lux_monitoring_pytest(
-    mock_piico_dev, mock_db_lux_functions, mock_lux_logger, mock_lux_time_sleep
+    mock_tsl2591, mock_db_lux_functions, mock_lux_logger, mock_lux_time_sleep
 ):
     lux.start_lux_monitoring(HOME_ID_TEST)
     assert lux._is_monitoring.is_set()
@@ -324,23 +325,18 @@ def test_stop_lux_monitoring_pytest(
     assert initial_thread is not None
     assert initial_thread.is_alive()
 
-    # Reset side_effect on sleep to allow stop_lux_monitoring to function normally
-    # as it might have its own sleeps or join timeouts that shouldn't be hyper-controlled by test side_effects.
-    mock_lux_time_sleep.side_effect = None
-    mock_lux_time_sleep.return_value = None  # Standard mock behavior
-
     lux.stop_lux_monitoring()
 
     assert not lux._is_monitoring.is_set()
     assert (
         not initial_thread.is_alive()
     ), "Thread should have been joined by stop_lux_monitoring"
-    assert lux._sensor_instance is None
+    assert lux._sensor is None
     mock_lux_logger.info.assert_any_call(
-        f"[{DEVICE_ID} ({DEVICE_NAME})] Attempting to stop lux monitoring..."
+        f"{LOG_PREFIX} Attempting to stop lux monitoring..."
     )
     mock_lux_logger.info.assert_any_call(
-        f"[{DEVICE_ID} ({DEVICE_NAME})] Lux monitoring stopped and resources (if any) released."
+        f"{LOG_PREFIX} Lux monitoring stopped and resources released."
     )
 
 